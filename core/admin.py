@@ -1,6 +1,11 @@
+from datetime import date
+
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Category, Course, Lesson
+from .exports import export_response, filter_days
+from .models import User, Category, Course, Lesson, Enrollment, Payment
+from .search import search_courses
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -25,3 +30,84 @@ class CourseAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description')
     prepopulated_fields = {'slug': ('title',)}
     inlines = [LessonInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Index plein texte plutôt que des icontains sur titre et description
+        if not search_term:
+            return queryset, False
+        ids = search_courses(Course.objects.all(), search_term, limit=1000).values_list('pk', flat=True)
+        return queryset.filter(pk__in=list(ids)), False
+
+class DateRangeFilter(admin.FieldListFilter):
+    # Du ... au ... (jours inclus, AAAA-MM-JJ) : mêmes bornes que --since/--until d'export_records
+    template = 'admin/core/date_range_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.since_param = f'{field_path}__since'
+        self.until_param = f'{field_path}__until'
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def expected_parameters(self):
+        return [self.since_param, self.until_param]
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        try:
+            since, until = (
+                date.fromisoformat(value) if value else None
+                for value in (self.used_parameters.get(self.since_param), self.used_parameters.get(self.until_param))
+            )
+        except ValueError as error:
+            raise IncorrectLookupParameters(error)
+        return filter_days(queryset, self.field_path, since, until)
+
+    def choices(self, changelist):
+        # Un seul « choix » : le formulaire, qui reprend les autres paramètres de la liste
+        params = self.expected_parameters()
+        yield {
+            'since_param': self.since_param,
+            'until_param': self.until_param,
+            'since': self.used_parameters.get(self.since_param, ''),
+            'until': self.used_parameters.get(self.until_param, ''),
+            'hidden': [(name, value) for name, value in changelist.params.items() if name not in params],
+            'reset_url': changelist.get_query_string(remove=params),
+        }
+
+class StreamingExportMixin:
+    # Export en flux de la sélection (ou de tous les résultats filtrés) : mémoire constante
+    export_kind = None
+    actions = ['export_csv', 'export_jsonl']
+    # Pas de COUNT(*) complet sur des tables de plusieurs millions de lignes
+    show_full_result_count = False
+
+    @admin.action(description="Exporter en CSV")
+    def export_csv(self, request, queryset):
+        return export_response(self.export_kind, 'csv', queryset=queryset)
+
+    @admin.action(description="Exporter en JSON lines")
+    def export_jsonl(self, request, queryset):
+        return export_response(self.export_kind, 'jsonl', queryset=queryset)
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(StreamingExportMixin, admin.ModelAdmin):
+    export_kind = 'enrollments'
+    list_display = ('user', 'course', 'enrolled_at', 'progress')
+    list_select_related = ('user', 'course')
+    list_filter = (('course', admin.RelatedOnlyFieldListFilter), ('enrolled_at', DateRangeFilter))
+    raw_id_fields = ('user', 'course')
+    date_hierarchy = 'enrolled_at'
+    search_fields = ('user__username', 'user__email')
+
+@admin.register(Payment)
+class PaymentAdmin(StreamingExportMixin, admin.ModelAdmin):
+    export_kind = 'payments'
+    list_display = ('transaction_id', 'user', 'course', 'amount', 'status', 'created_at')
+    list_filter = (
+        'status', ('course', admin.RelatedOnlyFieldListFilter), ('created_at', DateRangeFilter),
+    )
+    list_select_related = ('user', 'course')
+    raw_id_fields = ('user', 'course')
+    date_hierarchy = 'created_at'
+    search_fields = ('transaction_id', 'user__username', 'user__email')
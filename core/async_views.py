@@ -0,0 +1,78 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .cache import aget_catalog_version, catalog_etag
+from .db_routers import ais_catalog_pinned, reading_from_replica
+from .models import Category, Course, Lesson
+from .pagination import CourseCursorPagination
+from .serializers import CategorySerializer, CourseListSerializer, CourseSerializer
+
+# Lecture seule du catalogue servie en async (ASGI) : un client lent n'immobilise aucun worker.
+# Réponses identiques à celles des viewsets DRF pour un visiteur anonyme.
+
+CACHE_TIMEOUT = 60 * 15
+
+
+async def catalog_response(request, build):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    version = await aget_catalog_version()
+    url = request.build_absolute_uri()
+    etag = catalog_etag(version, 'json', url)
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        key = f"catalog:{version}:async:{url}"
+        content = await cache.aget(key)
+        if content is None:
+            # Visiteurs anonymes : rien à relire de leurs propres écritures, réplica si configuré
+            # (sauf juste après une modification du catalogue)
+            with reading_from_replica(not await ais_catalog_pinned()):
+                content = JSONRenderer().render(await build(Request(request)))
+            await cache.aset(key, content, CACHE_TIMEOUT)
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+async def _categories(request):
+    categories = [category async for category in Category.objects.filter(is_active=True)]
+    return CategorySerializer(categories, many=True, context={'request': request}).data
+
+
+async def _courses(request):
+    queryset = Course.objects.filter(is_published=True).select_related('instructor', 'category')
+    paginator = CourseCursorPagination()
+    # La pagination DRF évalue le queryset de façon synchrone
+    page = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+    data = CourseListSerializer(page, many=True, context={'request': request}).data
+    return paginator.get_paginated_response(data).data
+
+
+async def _course(request, pk):
+    queryset = Course.objects.filter(is_published=True).select_related('instructor', 'category').prefetch_related(
+        Prefetch('lessons', queryset=Lesson.objects.order_by('display_order', 'id'))
+    )
+    courses = [course async for course in queryset.filter(pk=pk)]
+    if not courses:
+        raise Http404
+    return CourseSerializer(courses[0], context={'request': request}).data
+
+
+async def category_list(request):
+    return await catalog_response(request, _categories)
+
+
+async def course_list(request):
+    return await catalog_response(request, _courses)
+
+
+async def course_detail(request, pk):
+    return await catalog_response(request, lambda request: _course(request, pk))
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def _version_for_hash(password_hash):
+    return salted_hmac('core.token_version', password_hash).hexdigest()[:16]
+
+
+def token_version(user):
+    # Change avec le hash du mot de passe : les anciens jetons deviennent invalides
+    return _version_for_hash(user.password)
+
+
+def _cached_fields():
+    # Colonnes mises en cache : tout sauf le hash du mot de passe
+    return [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[TOKEN_VERSION_CLAIM] = token_version(user)
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # Évite une lecture de la table users à chaque requête authentifiée. Le cache ne contient
+    # qu'une projection (sans le hash du mot de passe) et la version attendue du jeton ;
+    # l'utilisateur est reconstruit avec le mot de passe différé.
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        fields = _cached_fields()
+        key = user_cache_key(user_id)
+        row = cache.get(key)
+        if row is None:
+            row = User.objects.filter(pk=user_id).values(*fields, 'password').first()
+            if row is None:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            row['version'] = _version_for_hash(row.pop('password'))
+            cache.set(key, row, settings.AUTH_USER_CACHE_TIMEOUT)
+        if not row['is_active']:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        # Jeton sans version (émis avant leur introduction) : refusé
+        if validated_token.get(TOKEN_VERSION_CLAIM) != row['version']:
+            raise AuthenticationFailed("Token invalidé par un changement de mot de passe.", code="token_outdated")
+        return User.from_db(DEFAULT_DB_ALIAS, fields, [row[name] for name in fields])
@@ -0,0 +1,135 @@
+import itertools
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .authentication import VersionedTokenObtainPairSerializer
+from .models import Course, User
+
+BENCH_PASSWORD = 'bench-password-2026'
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[['BenchContext'], str]
+    data: Optional[Callable[['BenchContext', int], dict]] = None
+    authenticated: bool = False
+    iterations: int = 100
+    cold_cache: bool = True
+
+
+@dataclass
+class BenchContext:
+    user: User
+    course_id: int
+    token: str = ''
+    counter: itertools.count = field(default_factory=itertools.count)
+
+
+SCENARIOS = [
+    Scenario('courses_list', 'get', lambda ctx: '/api/courses/'),
+    Scenario('courses_list_cached', 'get', lambda ctx: '/api/courses/', cold_cache=False),
+    Scenario('course_detail', 'get', lambda ctx: f'/api/courses/{ctx.course_id}/'),
+    Scenario('categories_list', 'get', lambda ctx: '/api/categories/'),
+    Scenario('lessons_list', 'get', lambda ctx: f'/api/lessons/?course={ctx.course_id}', authenticated=True,
+             cold_cache=False),
+    Scenario('users_me', 'get', lambda ctx: '/api/users/me/', authenticated=True, cold_cache=False),
+    # Le hachage du mot de passe domine : peu d'itérations suffisent
+    Scenario('token_obtain', 'post', lambda ctx: '/api/token/',
+             data=lambda ctx, i: {'username': ctx.user.username, 'password': BENCH_PASSWORD},
+             iterations=10),
+    Scenario('user_register', 'post', lambda ctx: '/api/users/',
+             data=lambda ctx, i: {'username': f'bench_new_{next(ctx.counter)}', 'password': BENCH_PASSWORD,
+                                  'email': 'bench@example.td'},
+             iterations=10),
+]
+
+
+def build_context():
+    user = User.objects.create_user('bench_user', password=BENCH_PASSWORD)
+    course = Course.objects.filter(is_published=True).order_by('-created_at', '-id').first()
+    token = str(VersionedTokenObtainPairSerializer.get_token(user).access_token)
+    return BenchContext(user=user, course_id=course.pk if course else 0, token=token)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(scenario, ctx, iterations=None, alloc_iterations=5):
+    iterations = iterations or scenario.iterations
+    client = APIClient()
+    if scenario.authenticated:
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {ctx.token}')
+
+    def call(i):
+        if scenario.cold_cache:
+            cache.clear()
+        kwargs = {'format': 'json'}
+        if scenario.data:
+            kwargs['data'] = scenario.data(ctx, i)
+        return getattr(client, scenario.method)(scenario.path(ctx), **kwargs)
+
+    if not scenario.cold_cache:
+        call(-1)  # préchauffage du cache
+
+    timings, queries, statuses = [], [], set()
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = call(i)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+
+    # Passe séparée pour les allocations : tracemalloc fausserait les latences
+    peaks = []
+    for i in range(min(alloc_iterations, iterations)):
+        tracemalloc.start()
+        call(iterations + i)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'queries': max(queries),
+        'alloc_peak_kb': round(max(peaks), 1) if peaks else 0,
+        'statuses': sorted(statuses),
+    }
+
+
+def compare(results, baseline, tolerance=0.5, noise_floor_ms=2.0):
+    # Retourne (régressions, dérives) par rapport à la référence enregistrée.
+    # Régressions : requêtes SQL et codes HTTP, indépendants de la machine.
+    # Dérives : p95 et allocations au-delà de la tolérance relative ; la référence pouvant venir
+    # d'une autre machine, elles ne sont bloquantes qu'à la demande (bench_api --check-latency)
+    regressions, drifts = [], []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if current['queries'] > reference['queries']:
+            regressions.append(f"{name}: {current['queries']} requêtes SQL (référence {reference['queries']})")
+        if current['statuses'] != reference['statuses']:
+            regressions.append(f"{name}: codes HTTP {current['statuses']} (référence {reference['statuses']})")
+        # p99 est trop bruité sur quelques itérations : seul p95 est comparé
+        limit = max(reference['p95_ms'] * (1 + tolerance), reference['p95_ms'] + noise_floor_ms)
+        if current['p95_ms'] > limit:
+            drifts.append(f"{name}: p95 {current['p95_ms']:.2f} ms > {limit:.2f} ms")
+        limit = reference['alloc_peak_kb'] * (1 + tolerance) + 64
+        if current['alloc_peak_kb'] > limit:
+            drifts.append(f"{name}: allocations {current['alloc_peak_kb']:.0f} Ko > {limit:.0f} Ko")
+    return regressions, drifts
@@ -0,0 +1,142 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_routers import pin_catalog_to_primary
+
+CATALOG_VERSION_KEY = 'catalog:version'
+# Compteurs des cours (inscriptions, revenu, progression) : au plus une version par intervalle
+COUNTERS_DIRTY_KEY = 'catalog:counters:dirty'
+COUNTERS_THROTTLE_KEY = 'catalog:counters:bumped'
+COUNTERS_BUMP_INTERVAL = 30
+
+
+def get_catalog_version():
+    values = cache.get_many([CATALOG_VERSION_KEY, COUNTERS_DIRTY_KEY])
+    if COUNTERS_DIRTY_KEY in values:
+        # Compteurs modifiés pendant l'intervalle précédent : repris dès qu'il est écoulé
+        values[CATALOG_VERSION_KEY] = flush_catalog_counters() or values.get(CATALOG_VERSION_KEY)
+    version = values.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Première lecture (ou cache vidé) : on repart d'une version connue
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+async def aget_catalog_version():
+    values = await cache.aget_many([CATALOG_VERSION_KEY, COUNTERS_DIRTY_KEY])
+    if COUNTERS_DIRTY_KEY in values:
+        values[CATALOG_VERSION_KEY] = await aflush_catalog_counters() or values.get(CATALOG_VERSION_KEY)
+    version = values.get(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = await cache.aget(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def _incr_catalog_version():
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        return cache.incr(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    # Épinglage avant le changement de version, renouvelé à la validation de la transaction
+    pin_catalog_to_primary()
+    transaction.on_commit(pin_catalog_to_primary)
+    return _incr_catalog_version()
+
+
+def flush_catalog_counters():
+    # Nouvelle version si l'intervalle est écoulé ; sinon None, le marqueur reste posé.
+    # Pas d'épinglage : des compteurs en retard de quelques secondes sont admis
+    if not cache.add(COUNTERS_THROTTLE_KEY, 1, timeout=COUNTERS_BUMP_INTERVAL):
+        return None
+    cache.delete(COUNTERS_DIRTY_KEY)
+    return _incr_catalog_version()
+
+
+async def aflush_catalog_counters():
+    if not await cache.aadd(COUNTERS_THROTTLE_KEY, 1, timeout=COUNTERS_BUMP_INTERVAL):
+        return None
+    await cache.adelete(COUNTERS_DIRTY_KEY)
+    try:
+        return await cache.aincr(CATALOG_VERSION_KEY)
+    except ValueError:
+        await cache.aadd(CATALOG_VERSION_KEY, 1, timeout=None)
+        return await cache.aincr(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_counters():
+    # Appelé après validation (core.stats) : les compteurs affichés par le catalogue ont changé
+    cache.set(COUNTERS_DIRTY_KEY, 1, timeout=None)
+    flush_catalog_counters()
+
+
+def catalog_etag(version, renderer_format, path):
+    # Même découpage que la clé de cache : une réponse JSON ne valide pas sa variante HTML
+    digest = hashlib.md5(f"{version}:{renderer_format}:{path}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+class CatalogCacheMixin:
+    # Met en cache les réponses publiques du catalogue, invalidées par la version globale
+    cached_actions = ('list', 'retrieve')
+    catalog_cache_timeout = 60 * 15
+    # True si la réponse ne dépend pas de l'utilisateur connecté
+    cache_authenticated = False
+
+    def _is_cacheable(self, request):
+        return (
+            self.action in self.cached_actions
+            and request.method == 'GET'
+            and (self.cache_authenticated or not request.user.is_authenticated)
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        self._catalog_etag = None
+        return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self._is_cacheable(request):
+            version = get_catalog_version()
+            path = request.build_absolute_uri()
+            renderer_format = request.accepted_renderer.format
+            self._catalog_etag = catalog_etag(version, renderer_format, path)
+            self._catalog_key = f"catalog:{version}:{renderer_format}:{path}"
+
+    def handle_cached(self, handler, request, *args, **kwargs):
+        if self._catalog_etag is None:
+            return handler(request, *args, **kwargs)
+        if request.META.get('HTTP_IF_NONE_MATCH') == self._catalog_etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        data = cache.get(self._catalog_key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(self._catalog_key, response.data, self.catalog_cache_timeout)
+            return response
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.handle_cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.handle_cached(super().retrieve, request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._catalog_etag is not None and response.status_code in (200, 304):
+            response['ETag'] = self._catalog_etag
+            patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+            patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
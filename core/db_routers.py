@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = 'replica'
+# Modèles du catalogue lus sur le réplica ; tout le reste (utilisateurs, paiements...) reste sur le primaire
+REPLICA_MODELS = {'core.Course', 'core.Category', 'core.Lesson'}
+
+CATALOG_PIN_KEY = 'db:primary:catalog'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in connections
+
+
+def pin_key(user_id):
+    return f"db:primary:{user_id}"
+
+
+def pin_to_primary(user_id):
+    # Lecture de ses propres écritures : le temps que le réplica rattrape son retard
+    cache.set(pin_key(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def pin_catalog_to_primary():
+    # Après une modification du catalogue, les entrées de cache recréées sous la nouvelle version
+    # sont lues sur le primaire : le réplica peut ne pas avoir encore reçu l'écriture
+    if replica_enabled():
+        cache.set(CATALOG_PIN_KEY, True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    # Une seule lecture du cache : épinglage du catalogue et de l'utilisateur
+    keys = [CATALOG_PIN_KEY] + ([pin_key(user.pk)] if user.is_authenticated else [])
+    return bool(cache.get_many(keys))
+
+
+async def ais_catalog_pinned():
+    return bool(await cache.aget(CATALOG_PIN_KEY))
+
+
+@contextmanager
+def reading_from_replica(enabled=True):
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    # Sans alias 'replica' configuré (DATABASE_REPLICA_URL), tout reste sur 'default'
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and model._meta.label in REPLICA_MODELS and replica_enabled():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Même données des deux côtés : les relations entre alias sont légitimes
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA_ALIAS else None
+
+
+class ReplicaReadMixin:
+    # Viewsets du catalogue : GET/HEAD/OPTIONS lus sur le réplica, sauf juste après une écriture
+    # de l'utilisateur ou une modification du catalogue
+
+    def dispatch(self, request, *args, **kwargs):
+        with reading_from_replica(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_enabled() and not is_pinned(request.user):
+            _read_from_replica.set(True)
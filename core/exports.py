@@ -0,0 +1,78 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Enrollment, Payment
+from .stats import day_range
+
+# Colonnes exportées : lues par values_list, sans instancier de modèles
+EXPORTS = {
+    'enrollments': (Enrollment, 'enrolled_at', (
+        'id', 'enrolled_at', 'user_id', 'user__username', 'user__email',
+        'course_id', 'course__title', 'progress', 'completed_lessons',
+    )),
+    'payments': (Payment, 'created_at', (
+        'id', 'created_at', 'transaction_id', 'status', 'amount', 'course__currency',
+        'user_id', 'user__username', 'user__email', 'course_id', 'course__title',
+    )),
+}
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    # Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de la stocker
+    def write(self, value):
+        return value
+
+
+def filter_days(queryset, date_field, since=None, until=None):
+    # Jours inclus ; bornes datetime pour profiter de l'index sur date_field (aussi utilisé par l'admin)
+    if since or until:
+        begin, end = day_range(since or until, until or since)
+        if since:
+            queryset = queryset.filter(**{f'{date_field}__gte': begin})
+        if until:
+            queryset = queryset.filter(**{f'{date_field}__lt': end})
+    return queryset
+
+
+def export_rows(kind, queryset=None, since=None, until=None, course_ids=None, chunk_size=CHUNK_SIZE):
+    model, date_field, columns = EXPORTS[kind]
+    queryset = model.objects.all() if queryset is None else queryset
+    queryset = filter_days(queryset, date_field, since, until)
+    if course_ids:
+        queryset = queryset.filter(course_id__in=course_ids)
+    # iterator() : curseur côté serveur (PostgreSQL), lecture par paquets de chunk_size lignes
+    rows = queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+    return columns, rows
+
+
+def iter_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_export(kind, fmt='csv', **filters):
+    columns, rows = export_rows(kind, **filters)
+    return iter_csv(columns, rows) if fmt == 'csv' else iter_jsonl(columns, rows)
+
+
+def export_response(kind, fmt='csv', **filters):
+    response = StreamingHttpResponse(stream_export(kind, fmt, **filters), content_type=FORMATS[fmt])
+    filename = f"{kind}-{timezone.localdate():%Y%m%d}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,70 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpeg', 'JPEG', 'image/jpeg'),
+)
+# Champ image -> champ JSON des déclinaisons, par modèle
+IMAGE_FIELDS = {
+    'core.Course': ('thumbnail', 'thumbnail_variants'),
+    'core.User': ('avatar', 'avatar_variants'),
+}
+
+
+def _encode(image, pil_format):
+    if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    # Aucune métadonnée (EXIF, GPS...) n'est recopiée : seule l'image est réencodée
+    image.save(buffer, format=pil_format, quality=80, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file, widths=VARIANT_WIDTHS):
+    storage = field_file.storage
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    base = os.path.splitext(field_file.name)[0]
+    variants = {'source': field_file.name, 'formats': {}}
+    for extension, pil_format, mime_type in VARIANT_FORMATS:
+        sources = []
+        for width in sorted(widths):
+            # Jamais d'agrandissement : on s'arrête à la taille d'origine
+            if sources and width > image.width:
+                break
+            resized = image.copy()
+            resized.thumbnail((width, width * 10))
+            name = storage.save(
+                f"variants/{base}-{resized.width}w.{extension}", ContentFile(_encode(resized, pil_format))
+            )
+            sources.append({
+                'name': name, 'url': storage.url(name),
+                'width': resized.width, 'height': resized.height,
+            })
+        variants['formats'][extension] = {
+            'type': mime_type,
+            'srcset': ', '.join(f"{s['url']} {s['width']}w" for s in sources),
+            'sources': sources,
+        }
+    return variants
+
+
+def delete_variants(storage, variants):
+    for fmt in (variants or {}).get('formats', {}).values():
+        for source in fmt['sources']:
+            storage.delete(source['name'])
+
+
+def needs_processing(instance, label):
+    image_field, variants_field = IMAGE_FIELDS[label]
+    field_file = getattr(instance, image_field)
+    variants = getattr(instance, variants_field) or {}
+    return (field_file.name or None) != variants.get('source')
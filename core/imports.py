@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .cache import bump_catalog_version
+from .models import Course, Lesson
+from .search import index_courses
+
+SLUG_MAX_LENGTH = Course._meta.get_field('slug').max_length
+
+# Colonnes CSV : une ligne par leçon, champs du cours répétés (titre vide = cours sans leçon)
+COURSE_COLUMNS = ('title', 'slug', 'description', 'category', 'level', 'price', 'currency', 'is_published')
+LESSON_COLUMNS = {'lesson_title': 'title', 'lesson_content': 'content',
+                  'lesson_video_url': 'video_url', 'lesson_order': 'display_order'}
+
+
+def parse_csv(text):
+    courses = {}
+    for row in csv.DictReader(io.StringIO(text)):
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        key = (row.get('slug', ''), row.get('title', ''))
+        course = courses.setdefault(key, {
+            **{column: row[column] for column in COURSE_COLUMNS if row.get(column)}, 'lessons': [],
+        })
+        if row.get('lesson_title'):
+            course['lessons'].append({
+                field: row[column] for column, field in LESSON_COLUMNS.items() if row.get(column)
+            })
+    return list(courses.values())
+
+
+def parse_upload(upload):
+    text = upload.read().decode('utf-8-sig')
+    if upload.name.lower().endswith('.csv'):
+        return parse_csv(text)
+    data = json.loads(text)
+    return data.get('courses', [data]) if isinstance(data, dict) else data
+
+
+def resolve_slugs(bases):
+    # Une seule requête pour tous les slugs déjà pris (base exacte ou base-N)
+    bases = [base[:SLUG_MAX_LENGTH - 5] or 'cours' for base in bases]
+    lookups = reduce(or_, (Q(slug=base) | Q(slug__startswith=f'{base}-') for base in set(bases)))
+    taken = set(Course.objects.filter(lookups).values_list('slug', flat=True))
+    slugs = []
+    for base in bases:
+        slug, suffix = base, 2
+        while slug in taken:
+            slug, suffix = f'{base}-{suffix}', suffix + 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+@transaction.atomic
+def import_courses(courses, instructor):
+    # courses : données validées par CourseImportBatchSerializer ; bulk_create ne déclenche
+    # aucun signal, d'où les compteurs, l'index de recherche et le cache gérés ici
+    slugs = resolve_slugs([data.get('slug') or slugify(data['title']) for data in courses])
+    created = Course.objects.bulk_create([
+        Course(
+            **{field: value for field, value in data.items() if field not in ('lessons', 'slug', 'instructor')},
+            slug=slug, instructor=data.get('instructor') or instructor, lessons_count=len(data['lessons']),
+        )
+        for data, slug in zip(courses, slugs)
+    ])
+    Lesson.objects.bulk_create([
+        Lesson(course=course, **{'display_order': order, **lesson})
+        for course, data in zip(created, courses)
+        for order, lesson in enumerate(data['lessons'])
+    ], batch_size=1000)
+    index_courses([course.pk for course in created])
+    bump_catalog_version()
+    return created
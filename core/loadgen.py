@@ -0,0 +1,210 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import User, Category, Course, Lesson, Enrollment, Payment
+from .search import index_courses
+from .stats import reconcile_course_stats
+from .tree import rebuild_paths
+
+TOPICS = [
+    'Python', 'Django', 'JavaScript', 'Excel', 'Word', 'PowerPoint', 'Marketing', 'SEO',
+    'Comptabilité', 'Gestion', 'Photoshop', 'Canva', 'Entrepreneuriat', 'Finance', 'Réseaux',
+    'Agriculture', 'Élevage', 'Santé', 'Anglais', 'Arabe', 'Communication', 'Vente',
+]
+LEVELS = ('beginner', 'intermediate', 'advanced')
+LOAD_PASSWORD = 'tchadskills-load'
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    # auto_now_add écrase les dates fournies : on le coupe le temps du peuplement
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class LoadGenerator:
+    # Génère un jeu de données volumineux et reproductible (même graine => mêmes données)
+
+    def __init__(self, seed=42, batch_size=5000, prefix='load', progress=None):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.prefix = f"{prefix}{seed}"
+        self.progress = progress or (lambda label, done, total, elapsed: None)
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+
+    def exists(self):
+        return User.objects.filter(username__startswith=f"{self.prefix}_").exists()
+
+    def run(self, users, courses, lessons, enrollments, payments, categories=20):
+        self.create_users(users)
+        self.create_categories(categories)
+        self.create_courses(courses)
+        self.create_lessons(lessons)
+        self.index_courses()
+        self.create_enrollments(enrollments)
+        self.create_payments(payments)
+        self.reconcile_stats()
+
+    def _insert(self, label, model, total, build):
+        # build(i) fabrique la i-ème instance ; une transaction par lot
+        start = time.perf_counter()
+        done = 0
+        while done < total:
+            size = min(self.batch_size, total - done)
+            objs = [build(i) for i in range(done, done + size)]
+            with transaction.atomic():
+                model.objects.bulk_create(objs, batch_size=self.batch_size)
+            done += size
+            self.progress(label, done, total, time.perf_counter() - start)
+
+    def _past(self, max_days=365):
+        return self.now - timedelta(seconds=self.rng.randrange(max_days * 24 * 3600))
+
+    def create_users(self, total):
+        password = make_password(LOAD_PASSWORD)  # un seul hachage pour tous les comptes
+
+        def build(i):
+            return User(
+                username=f"{self.prefix}_u{i}", email=f"{self.prefix}_u{i}@example.td",
+                password=password, user_type='instructor' if i % 20 == 0 else 'student',
+                date_joined=self._past(),
+            )
+
+        self._insert('users', User, total, build)
+        queryset = User.objects.filter(username__startswith=f"{self.prefix}_u").order_by('id')
+        self.user_ids = list(queryset.values_list('id', flat=True))
+        self.instructor_ids = list(
+            queryset.filter(user_type='instructor').values_list('id', flat=True)
+        ) or self.user_ids
+
+    def create_categories(self, total):
+        def build(i):
+            return Category(
+                name=f"{TOPICS[i % len(TOPICS)]} {i}", slug=f"{self.prefix}-cat-{i}",
+                display_order=i, is_active=True,
+            )
+
+        self._insert('categories', Category, total, build)
+        rebuild_paths()
+        self.category_ids = list(
+            Category.objects.filter(slug__startswith=f"{self.prefix}-cat-")
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_courses(self, total):
+        self.course_prices = []
+
+        def build(i):
+            price = Decimal(self.rng.choice((0, 5000, 10000, 15000, 25000)))
+            self.course_prices.append(price)
+            topic = self.rng.choice(TOPICS)
+            return Course(
+                title=f"{topic} pour tous {i}", slug=f"{self.prefix}-cours-{i}",
+                description=f"Formation complète en {topic} pour le Tchad.",
+                instructor_id=self.rng.choice(self.instructor_ids),
+                category_id=self.rng.choice(self.category_ids) if self.category_ids else None,
+                level=self.rng.choice(LEVELS), price=price,
+                is_published=self.rng.random() < 0.9, created_at=self._past(),
+            )
+
+        with explicit_timestamps(Course._meta.get_field('created_at')):
+            self._insert('courses', Course, total, build)
+        self.course_ids = list(
+            Course.objects.filter(slug__startswith=f"{self.prefix}-cours-")
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_lessons(self, total):
+        if not self.course_ids:
+            return
+        per_course, extra = divmod(total, len(self.course_ids))
+
+        def lessons():
+            for index, course_id in enumerate(self.course_ids):
+                for order in range(per_course + (1 if index < extra else 0)):
+                    yield course_id, order
+
+        plan = lessons()
+
+        def build(i):
+            course_id, order = next(plan)
+            return Lesson(
+                course_id=course_id, title=f"Leçon {order + 1}",
+                content="Contenu de la leçon. " * 20, display_order=order,
+            )
+
+        self._insert('lessons', Lesson, total, build)
+
+    def index_courses(self):
+        # bulk_create ne déclenche pas les signaux : on alimente l'index de recherche par lots
+        start = time.perf_counter()
+        for done in range(0, len(self.course_ids), self.batch_size):
+            batch = self.course_ids[done:done + self.batch_size]
+            with transaction.atomic():
+                index_courses(batch)
+            self.progress('search', done + len(batch), len(self.course_ids), time.perf_counter() - start)
+
+    def reconcile_stats(self):
+        # Compteurs dénormalisés des cours : bulk_create contourne aussi ces signaux
+        start = time.perf_counter()
+        for done in range(0, len(self.course_ids), self.batch_size):
+            batch = self.course_ids[done:done + self.batch_size]
+            reconcile_course_stats(batch)
+            self.progress('stats', done + len(batch), len(self.course_ids), time.perf_counter() - start)
+
+    def _pair(self, k):
+        # k-ième couple (utilisateur, cours) unique : décalage aléatoire par utilisateur
+        users = len(self.user_ids)
+        user_index, round_ = k % users, k // users
+        course_index = (self.user_offsets[user_index] + round_) % len(self.course_ids)
+        return user_index, course_index
+
+    def create_enrollments(self, total):
+        if not self.user_ids or not self.course_ids:
+            return
+        total = min(total, len(self.user_ids) * len(self.course_ids))
+        self.user_offsets = [self.rng.randrange(len(self.course_ids)) for _ in self.user_ids]
+        self.enrollment_count = total
+
+        def build(k):
+            user_index, course_index = self._pair(k)
+            return Enrollment(
+                user_id=self.user_ids[user_index], course_id=self.course_ids[course_index],
+                progress=self.rng.randrange(101), enrolled_at=self._past(),
+            )
+
+        with explicit_timestamps(Enrollment._meta.get_field('enrolled_at')):
+            self._insert('enrollments', Enrollment, total, build)
+
+    def create_payments(self, total):
+        if not getattr(self, 'enrollment_count', 0):
+            return
+
+        def build(k):
+            # Les premiers paiements couvrent les inscriptions, le reste sont des échecs/relances
+            user_index, course_index = self._pair(k % self.enrollment_count)
+            if k < self.enrollment_count:
+                status = 'completed' if self.rng.random() < 0.95 else 'pending'
+            else:
+                status = 'failed'
+            return Payment(
+                user_id=self.user_ids[user_index], course_id=self.course_ids[course_index],
+                amount=self.course_prices[course_index], transaction_id=f"{self.prefix}-{k}",
+                status=status, created_at=self._past(),
+            )
+
+        with explicit_timestamps(Payment._meta.get_field('created_at')):
+            self._insert('payments', Payment, total, build)
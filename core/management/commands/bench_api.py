@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from core.benchmarks import SCENARIOS, build_context, compare, run_scenario
+from core.loadgen import LoadGenerator
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'api_baseline.json'
+
+
+class Command(BaseCommand):
+    help = "Mesure latences (p50/p95/p99), requêtes SQL et allocations de l'API et compare à la référence"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Enregistre les résultats comme nouvelle référence")
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help="Dégradation relative tolérée des latences et allocations")
+        parser.add_argument('--check-latency', action='store_true',
+                            help="Échoue aussi sur les latences et allocations (référence de la même machine)")
+        parser.add_argument('--iterations', type=int, default=None)
+        parser.add_argument('--only', nargs='*', default=None, help="Scénarios à exécuter")
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        # Base de test jetable (en mémoire sous SQLite) : la base configurée n'est jamais ouverte
+        existed = connection.vendor != 'sqlite' or Path(old_name).exists()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        try:
+            LoadGenerator(seed=options['seed']).run(
+                users=500, courses=options['courses'], lessons=options['courses'] * 10,
+                enrollments=2000, payments=2000,
+            )
+            ctx = build_context()
+            results = {}
+            for scenario in SCENARIOS:
+                if options['only'] and scenario.name not in options['only']:
+                    continue
+                results[scenario.name] = run_scenario(scenario, ctx, options['iterations'])
+                self.print_row(scenario.name, results[scenario.name])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connections.close_all()
+            if not existed and Path(old_name).exists() and not Path(old_name).stat().st_size:
+                # Fichier vide recréé par une reconnexion tardive : rien à conserver
+                Path(old_name).unlink()
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Référence enregistrée dans {baseline_path}"))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING("Aucune référence : relancez avec --save-baseline"))
+            return
+        regressions, drifts = compare(results, json.loads(baseline_path.read_text()), options['tolerance'])
+        if options['check_latency']:
+            regressions += drifts
+        else:
+            for drift in drifts:
+                self.stdout.write(self.style.WARNING(f"Latence (non bloquant) : {drift}"))
+        if regressions:
+            raise CommandError("Régressions de performance :\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la référence."))
+
+    def print_row(self, name, result):
+        self.stdout.write(
+            f"{name:<22} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+            f"p99 {result['p99_ms']:>8.2f} ms  {result['queries']:>3} req.  "
+            f"{result['alloc_peak_kb']:>8.1f} Ko  HTTP {result['statuses']}"
+        )
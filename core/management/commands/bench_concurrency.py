@@ -0,0 +1,63 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Débit sous connexions concurrentes d'un ou plusieurs serveurs déjà lancés, ex. : "
+        "gunicorn tchadskills_project.wsgi -w 2 -b :8000 et "
+        "gunicorn tchadskills_project.asgi -k uvicorn.workers.UvicornWorker -w 2 -b :8001, puis "
+        "bench_concurrency --url wsgi=http://127.0.0.1:8000/api/courses/ "
+        "--url asgi=http://127.0.0.1:8001/api/async/courses/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', required=True, help="[libellé=]URL à solliciter")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        for target in options['url']:
+            label, _, url = target.rpartition('=')
+            if not url.startswith('http'):
+                raise CommandError(f"URL invalide : {target}")
+            result = self.run(url, options['concurrency'], options['requests'], options['timeout'])
+            self.stdout.write(
+                f"{label or url:<12} {result['rps']:>8.1f} req/s  p50 {result['p50']:>8.1f} ms  "
+                f"p95 {result['p95']:>8.1f} ms  p99 {result['p99']:>8.1f} ms  erreurs {result['errors']}"
+            )
+
+    def run(self, url, concurrency, total, timeout):
+        local = threading.local()
+        timings, errors = [], []
+
+        def hit(_):
+            # Une session (connexion keep-alive) par thread, comme un client réel
+            session = getattr(local, 'session', None) or requests.Session()
+            local.session = session
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=timeout)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            (timings if ok else errors).append(elapsed)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(hit, range(total)))
+        duration = time.perf_counter() - start
+        timings = timings or [0]
+        return {
+            'rps': total / duration, 'p50': statistics.median(timings),
+            'p95': percentile(timings, 95), 'p99': percentile(timings, 99), 'errors': len(errors),
+        }
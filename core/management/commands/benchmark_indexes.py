@@ -0,0 +1,111 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.loadgen import LoadGenerator
+from core.models import Category, Course, Lesson, Enrollment, Payment
+
+INDEXED_MODELS = (Category, Course, Lesson, Enrollment, Payment)
+
+
+class Command(BaseCommand):
+    help = "Compare plans EXPLAIN et latences des requêtes critiques avec et sans les index de core"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=5000)
+        parser.add_argument('--lessons-per-course', type=int, default=10)
+        parser.add_argument('--enrollments', type=int, default=20000)
+        parser.add_argument('--payments', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Base jetable (celle des tests) pour ne jamais toucher aux données réelles
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        try:
+            self.seed(options)
+            self.stdout.write(self.style.MIGRATE_HEADING("== Sans index =="))
+            self.drop_indexes()
+            before = self.measure(options['repeat'])
+            self.stdout.write(self.style.MIGRATE_HEADING("== Avec index =="))
+            self.create_indexes()
+            after = self.measure(options['repeat'])
+            self.report(before, after)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, options):
+        start = time.perf_counter()
+        generator = LoadGenerator(seed=options['seed'])
+        generator.run(
+            users=options['users'], courses=options['courses'],
+            lessons=options['courses'] * options['lessons_per_course'],
+            enrollments=options['enrollments'], payments=options['payments'],
+        )
+        self.sample_user_id = generator.rng.choice(generator.user_ids)
+        self.sample_course_id = generator.rng.choice(generator.course_ids)
+        self.now = generator.now
+        self.stdout.write(
+            f"Jeu de données : {options['users']} utilisateurs, {options['courses']} cours, "
+            f"{options['enrollments']} inscriptions, {options['payments']} paiements "
+            f"({time.perf_counter() - start:.1f}s)"
+        )
+
+    def queries(self):
+        return {
+            'catalogue (cours publiés récents)': Course.objects.filter(is_published=True).order_by('-created_at', '-id')[:20],
+            'catégories actives': Category.objects.filter(is_active=True).order_by('display_order', 'name'),
+            'leçons d\'un cours': Lesson.objects.filter(course_id=self.sample_course_id).order_by('display_order'),
+            'inscriptions d\'un utilisateur': Enrollment.objects.filter(user_id=self.sample_user_id).order_by('-enrolled_at')[:20],
+            'paiements en attente': Payment.objects.filter(status='pending').order_by('-created_at')[:50],
+            'paiements sur 7 jours': Payment.objects.filter(created_at__gte=self.now - timedelta(days=7)),
+        }
+
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+        self.analyze()
+
+    def create_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    editor.add_index(model, index)
+        self.analyze()
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def measure(self, repeat):
+        results = {}
+        for label, queryset in self.queries().items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[label] = {
+                'p50': statistics.median(timings),
+                'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            }
+            self.stdout.write(self.style.SQL_FIELD(label))
+            self.stdout.write(f"  {queryset.explain()}".replace('\n', '\n  '))
+        return results
+
+    def report(self, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING("== Latences (ms) =="))
+        self.stdout.write(f"{'requête':<36} {'p50 avant':>10} {'p50 après':>10} {'p95 avant':>10} {'p95 après':>10}")
+        for label in before:
+            self.stdout.write(
+                f"{label:<36} {before[label]['p50']:>10.2f} {after[label]['p50']:>10.2f} "
+                f"{before[label]['p95']:>10.2f} {after[label]['p95']:>10.2f}"
+            )
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = "Calcule les cours similaires (co-inscriptions, similarité cosinus) et conserve les K meilleurs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, help="Voisins conservés par cours (défaut : RECOMMENDATIONS_TOP_K)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Cours traités par bloc de matrice")
+        parser.add_argument('--min-support', type=int, default=1,
+                            help="Nombre minimal d'apprenants communs pour lier deux cours")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows = build_recommendations(
+            top_k=options['top_k'], batch_size=options['batch_size'], min_support=options['min_support'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {rows} paires de cours similaires en {time.perf_counter() - start:.1f}s"
+        ))
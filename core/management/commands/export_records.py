@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import CHUNK_SIZE, EXPORTS, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Exporte en flux les inscriptions ou les paiements (CSV ou JSON lines), en mémoire constante"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--since', help="Premier jour inclus (AAAA-MM-JJ)")
+        parser.add_argument('--until', help="Dernier jour inclus (AAAA-MM-JJ)")
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help="Limiter à ce cours (option répétable)")
+        parser.add_argument('--output', '-o', help="Fichier de sortie (défaut : sortie standard)")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"{option} doit être au format AAAA-MM-JJ.")
+
+    def handle(self, *args, **options):
+        chunks = stream_export(
+            options['kind'], options['format'],
+            since=self.parse_date(options['since'], '--since'),
+            until=self.parse_date(options['until'], '--until'),
+            course_ids=options['courses'], chunk_size=options['chunk_size'],
+        )
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        rows = 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                rows += 1
+        if options['format'] == 'csv':
+            rows -= 1  # En-tête
+        self.stderr.write(self.style.SUCCESS(f"✅ {rows} lignes exportées vers {options['output']}"))
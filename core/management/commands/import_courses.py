@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import import_courses, parse_upload
+from core.models import User
+from core.serializers import CourseImportBatchSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des cours et leurs leçons depuis un fichier JSON ou CSV "
+        "(validation complète puis écriture en une transaction)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier .json (un cours, une liste ou {\"courses\": [...]}) ou .csv")
+        parser.add_argument('--instructor', required=True,
+                            help="Nom d'utilisateur de l'instructeur par défaut des cours importés")
+
+    def handle(self, *args, **options):
+        instructor = User.objects.filter(username=options['instructor']).first()
+        if instructor is None:
+            raise CommandError(f"Utilisateur inconnu : {options['instructor']}")
+        path = Path(options['path'])
+        try:
+            with path.open('rb') as upload:
+                courses = parse_upload(upload)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Lecture de {path} impossible : {exc}")
+        # Import en ligne de commande : réservé à l'exploitation, tout instructeur est accepté
+        serializer = CourseImportBatchSerializer(data={'courses': courses}, context={'allow_any_instructor': True})
+        if not serializer.is_valid():
+            raise CommandError(f"Import refusé : {serializer.errors}")
+        created = import_courses(serializer.validated_data['courses'], instructor)
+        lessons = sum(course.lessons_count for course in created)
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(created)} cours et {lessons} leçons importés."))
@@ -0,0 +1,52 @@
+import random
+import time
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from core.views import ThrottledTokenObtainPairView
+
+
+class Command(BaseCommand):
+    help = (
+        "Simule du credential stuffing sur /api/token/ (un compte, plusieurs IP sources) et compare "
+        "le temps CPU consommé par le worker avec et sans limitation des tentatives. "
+        "Utilise le cache configuré (Redis si REDIS_URL est défini)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--ips', type=int, default=20, help="Nombre d'adresses sources distinctes")
+        parser.add_argument('--username', default='victime')
+
+    def handle(self, *args, **options):
+        # Identifiants uniques par exécution : les fenêtres d'une exécution précédente ne comptent pas
+        username = f"{options['username']}-{uuid.uuid4().hex[:8]}"
+        subnet = random.randint(0, 255)
+        for label, throttles in (('sans limite', ()), ('avec limite', None)):
+            view_options = {} if throttles is None else {'throttle_classes': throttles}
+            result = self.run(ThrottledTokenObtainPairView.as_view(**view_options),
+                              username, subnet, options['requests'], options['ips'])
+            statuses = '  '.join(f'{code}:{count}' for code, count in sorted(result['statuses'].items()))
+            self.stdout.write(
+                f"{label:<12} CPU {result['cpu']:>7.2f} s  ({result['cpu_per_request']:>6.1f} ms/req)  "
+                f"durée {result['wall']:>7.2f} s  réponses {statuses}"
+            )
+
+    def run(self, view, username, subnet, total, ips):
+        factory = APIRequestFactory()
+        statuses = Counter()
+        cpu, wall = time.process_time(), time.perf_counter()
+        for index in range(total):
+            request = factory.post(
+                '/api/token/', {'username': username, 'password': f'essai-{index}'}, format='json',
+                REMOTE_ADDR=f'198.18.{subnet}.{index % ips}',
+            )
+            statuses[view(request).status_code] += 1
+        cpu = time.process_time() - cpu
+        return {
+            'cpu': cpu, 'cpu_per_request': cpu * 1000 / total,
+            'wall': time.perf_counter() - wall, 'statuses': statuses,
+        }
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Course
+from core.stats import reconcile_course_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule en masse les compteurs dénormalisés des cours "
+        "(leçons, inscriptions, chiffre d'affaires, progression)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help="Limiter à ce cours (option répétable)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--check', action='store_true',
+                            help="Signaler les écarts sans les corriger")
+
+    def handle(self, *args, **options):
+        course_ids = options['courses'] or list(Course.objects.order_by('pk').values_list('pk', flat=True))
+        batch_size = options['batch_size']
+        drifted = 0
+        for start in range(0, len(course_ids), batch_size):
+            drifted += reconcile_course_stats(course_ids[start:start + batch_size], dry_run=options['check'])
+        if options['check']:
+            self.stdout.write(f"🔎 {drifted} cours sur {len(course_ids)} ont des compteurs à corriger.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {drifted} cours sur {len(course_ids)} corrigés."))
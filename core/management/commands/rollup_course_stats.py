@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.stats import rollup_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrège par cours et par jour les inscriptions, le chiffre d'affaires et la progression "
+        "(incrémental : seuls les nouveaux jours complets sont calculés)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--until', help="Dernier jour à agréger (AAAA-MM-JJ, défaut : hier)")
+        parser.add_argument('--overlap', type=int, default=2,
+                            help="Nombre de jours déjà agrégés à recalculer (paiements confirmés en retard)")
+
+    def handle(self, *args, **options):
+        until = None
+        if options['until']:
+            try:
+                until = date.fromisoformat(options['until'])
+            except ValueError:
+                raise CommandError("--until doit être au format AAAA-MM-JJ.")
+        rows = rollup_daily_stats(until=until, overlap=max(options['overlap'], 1))
+        self.stdout.write(self.style.SUCCESS(f"✅ {rows} agrégats quotidiens écrits."))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadgen import LoadGenerator, LOAD_PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        "Peuple la base avec un jeu de données volumineux pour les tests de charge "
+        "(ex. --users 100000 --courses 10000 --lessons 500000 --enrollments 2000000 --payments 2000000)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--courses', type=int, default=100)
+        parser.add_argument('--lessons', type=int, default=1000)
+        parser.add_argument('--enrollments', type=int, default=5000)
+        parser.add_argument('--payments', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help="Graine aléatoire (données reproductibles)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        generator = LoadGenerator(
+            seed=options['seed'], batch_size=options['batch_size'], progress=self.report,
+        )
+        if generator.exists():
+            raise CommandError(
+                f"Les données de la graine {options['seed']} existent déjà ; choisissez une autre --seed."
+            )
+        self.stdout.write(f"🚀 Génération des données de charge (graine {options['seed']})...")
+        generator.run(
+            users=options['users'], categories=options['categories'], courses=options['courses'],
+            lessons=options['lessons'], enrollments=options['enrollments'], payments=options['payments'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ Terminé. Mot de passe des comptes générés : {LOAD_PASSWORD}"
+        ))
+
+    def report(self, label, done, total, elapsed):
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(f"  {label:<12} {done:>9}/{total:<9} {rate:>10.0f} lignes/s")
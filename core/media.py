@@ -0,0 +1,129 @@
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseRedirect
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
+from .models import Course, Enrollment
+from .storage import lesson_media_storage
+
+TOKEN_SALT = 'core.media'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def can_access_lesson(user, lesson):
+    # Inscrits, instructeur du cours et administrateurs
+    if user.is_staff:
+        return True
+    if Enrollment.objects.filter(user=user, course_id=lesson.course_id).exists():
+        return True
+    return user.user_type == 'instructor' and Course.objects.filter(pk=lesson.course_id, instructor=user).exists()
+
+
+def storage_delivery():
+    # Mode storage : seulement si le stockage émet lui-même des URLs expirantes
+    # (S3 présigné) ; sinon (disque local...) le lien signé de core.media s'applique
+    return settings.MEDIA_DELIVERY == 'storage' and getattr(lesson_media_storage, 'querystring_auth', False)
+
+
+def media_url(lesson):
+    # Le jeton porte le nom du fichier : aucune requête SQL au téléchargement,
+    # et un fichier remplacé invalide les anciens liens
+    if storage_delivery():
+        return lesson_media_storage.url(lesson.media_file.name)
+    token = signing.dumps({'l': lesson.pk, 'f': lesson.media_file.name}, salt=TOKEN_SALT)
+    return reverse('lesson_media', args=[token])
+
+
+def parse_range(header, size):
+    # Une seule plage ; None : en-tête absent ou non géré (multi-plages), fichier complet
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-N : les N derniers octets
+        if not int(last):
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first >= size:
+        raise RangeNotSatisfiable
+    return (first, last) if first <= last else None
+
+
+class FileRange:
+    # Portion d'un fichier ouvert. fileno() reste exposé : gunicorn envoie la plage par
+    # sendfile (décalage courant du descripteur, longueur = Content-Length)
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def serve_file(request, storage, name):
+    try:
+        size = storage.size(name)
+        file = storage.open(name, 'rb')
+    except FileNotFoundError:
+        raise Http404("Fichier introuvable.")
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        first, last = byte_range
+        response = FileResponse(FileRange(file, first, last - first + 1), status=206)
+        response['Content-Length'] = last - first + 1
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def lesson_media(request, token):
+    # GET /api/media/<jeton>/ — fichier d'une leçon, lien valable MEDIA_URL_MAX_AGE secondes
+    try:
+        name = signing.loads(token, salt=TOKEN_SALT, max_age=settings.MEDIA_URL_MAX_AGE)['f']
+    except signing.BadSignature:
+        return HttpResponseForbidden("Lien expiré ou invalide.")
+
+    if storage_delivery():
+        return HttpResponseRedirect(lesson_media_storage.url(name))
+    if settings.MEDIA_DELIVERY == 'accel':
+        # nginx sert le fichier (location internal) et gère lui-même les plages
+        response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(name)
+    else:
+        response = serve_file(request, lesson_media_storage, name)
+    patch_cache_control(response, private=True, max_age=settings.MEDIA_URL_MAX_AGE)
+    return response
@@ -0,0 +1,88 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 500 * 1024, 1024 * 1024, 5 * 1024 * 1024)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.total:.6f}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class MetricsRegistry:
+    # Registre en mémoire, propre à chaque processus worker
+    HISTOGRAMS = (
+        ('tchadskills_request_duration_seconds', "Durée totale de la requête", DURATION_BUCKETS),
+        ('tchadskills_db_duration_seconds', "Temps passé en base de données", DURATION_BUCKETS),
+        ('tchadskills_render_duration_seconds', "Temps de sérialisation de la réponse", DURATION_BUCKETS),
+        ('tchadskills_db_queries', "Nombre de requêtes SQL par requête HTTP", QUERY_BUCKETS),
+        ('tchadskills_response_size_bytes', "Taille du corps de la réponse", SIZE_BUCKETS),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {name: {} for name, _, _ in self.HISTOGRAMS}
+        self.requests = {}
+
+    def observe(self, view, status, values):
+        # values : {nom de l'histogramme: valeur}
+        with self.lock:
+            for name, _, buckets in self.HISTOGRAMS:
+                if values.get(name) is not None:
+                    self.histograms[name].setdefault(view, Histogram(buckets)).observe(values[name])
+            key = (view, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, description, _ in self.HISTOGRAMS:
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+                for view, histogram in sorted(self.histograms[name].items()):
+                    lines.extend(histogram.samples(name, f'view="{view}"'))
+            lines += ['# HELP tchadskills_requests_total Requêtes HTTP traitées',
+                      '# TYPE tchadskills_requests_total counter']
+            for (view, status), count in sorted(self.requests.items()):
+                lines.append(f'tchadskills_requests_total{{view="{view}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def metrics_view(request):
+    # GET /metrics — format texte Prometheus, protégé par METRICS_TOKEN (Bearer).
+    # Sans jeton configuré : ouvert en DEBUG uniquement (chemins, latences et requêtes SQL exposés)
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,149 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_routers import pin_to_primary, replica_enabled
+from .metrics import registry
+
+logger = logging.getLogger('core.performance')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.statements = Counter()
+        self.slow_queries = []
+        self.view = 'unresolved'
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self.statements[sql] += 1
+        if duration * 1000 >= settings.PERF_SLOW_QUERY_MS:
+            self.slow_queries.append((duration, sql))
+
+
+def record_query(execute, sql, params, many, context):
+    # Installé sur chaque connexion ; ne mesure que pendant une requête HTTP instrumentée
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - start)
+
+
+def install_query_hook(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def view_label(view_func, request):
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    actions = getattr(view_func, 'actions', None) or {}
+    return f"{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+
+
+class PerformanceMiddleware:
+    # Temps total, SQL (nombre/durée), sérialisation et taille de réponse par vue DRF
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.view = view_label(view_func, request)
+
+    def process_template_response(self, request, response):
+        # Réponses DRF : le rendu JSON a lieu juste après ce point
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.start
+        app = max(total - metrics.db_time - metrics.render_time, 0)
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'render;dur={metrics.render_time * 1000:.2f}',
+            f'app;dur={app * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+        registry.observe(metrics.view, response.status_code, {
+            'tchadskills_request_duration_seconds': total,
+            'tchadskills_db_duration_seconds': metrics.db_time,
+            'tchadskills_render_duration_seconds': metrics.render_time,
+            'tchadskills_db_queries': metrics.queries,
+            'tchadskills_response_size_bytes': size,
+        })
+        self.warn(request, metrics, total)
+        return response
+
+    def warn(self, request, metrics, total):
+        if total * 1000 >= settings.PERF_SLOW_REQUEST_MS:
+            logger.warning("Requête lente %s %s (%s) : %.0f ms, %d requêtes SQL",
+                           request.method, request.path, metrics.view, total * 1000, metrics.queries)
+        for duration, sql in metrics.slow_queries:
+            logger.warning("Requête SQL lente (%.0f ms) dans %s : %s", duration * 1000, metrics.view, sql)
+        for sql, count in metrics.statements.items():
+            if count >= settings.PERF_N_PLUS_ONE_THRESHOLD:
+                logger.warning("N+1 probable dans %s : %d exécutions de %s", metrics.view, count, sql)
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    # Après une écriture réussie, l'utilisateur lit sur le primaire (cf. core.db_routers)
+
+    def process_response(self, request, response):
+        user = getattr(request, 'user', None)
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and user is not None and user.is_authenticated and replica_enabled()):
+            pin_to_primary(user.pk)
+        return response
@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+from core import search
+
+
+def build_search_index(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    Lesson = apps.get_model('core', 'Lesson')
+    search.create_index(schema_editor)
+
+    titles = {}
+    for course_id, title in Lesson.objects.order_by('course_id', 'display_order').values_list('course_id', 'title'):
+        titles.setdefault(course_id, []).append(title)
+    documents = {}
+    for course in Course.objects.select_related('category').iterator():
+        course.search_document = search.build_document(
+            course.title, course.description,
+            course.category.name if course.category else '', titles.get(course.pk, []),
+        )
+        course.save(update_fields=['search_document'])
+        documents[course.pk] = course.search_document
+    search.write_fts(documents)
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
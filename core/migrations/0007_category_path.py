@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+from core.tree import rebuild_paths
+
+
+def build_paths(apps, schema_editor):
+    rebuild_paths(apps.get_model('core', 'Category'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_user_type_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+from core.stats import reconcile_course_stats
+
+
+def backfill_stats(apps, schema_editor):
+    reconcile_course_stats(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='lessons_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='enrollments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='progress_total',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
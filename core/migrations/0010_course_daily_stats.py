@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 16:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_course_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_at'], name='enrollment_date_idx'),
+        ),
+        migrations.CreateModel(
+            name='CourseDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(default='XAF', max_length=10)),
+                ('enrollments', models.IntegerField(default=0)),
+                ('payments', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('progress_distribution', models.JSONField(blank=True, default=list)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='core.course')),
+            ],
+            options={
+                'verbose_name_plural': 'Course daily stats',
+                'ordering': ['day'],
+                'unique_together': {('course', 'day')},
+            },
+        ),
+    ]
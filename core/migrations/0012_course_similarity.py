@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 18:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_sync_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-enrollments_count'], name='course_category_popular_idx'),
+        ),
+        migrations.CreateModel(
+            name='CourseSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='core.course')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='core.course')),
+            ],
+            options={
+                'verbose_name_plural': 'Course similarities',
+                'unique_together': {('course', 'similar')},
+                'indexes': [models.Index(fields=['course', 'rank'], name='similarity_course_rank_idx')],
+            },
+        ),
+    ]
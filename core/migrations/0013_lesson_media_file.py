@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 19:10
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_course_similarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='media_file',
+            field=models.FileField(blank=True, storage=core.storage.get_lesson_media_storage, upload_to='lessons/%Y/%m/'),
+        ),
+    ]
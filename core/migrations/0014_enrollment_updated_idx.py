@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_lesson_media_file'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['updated_at'], name='enrollment_updated_idx'),
+        ),
+    ]
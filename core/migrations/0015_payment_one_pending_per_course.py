@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+def fail_duplicate_pending(apps, schema_editor):
+    # Paiements en attente en double : seul le plus récent reste en attente
+    Payment = apps.get_model('core', 'Payment')
+    kept = set()
+    for payment in Payment.objects.filter(status='pending').order_by('-created_at', '-pk'):
+        key = (payment.user_id, payment.course_id)
+        if key in kept:
+            Payment.objects.filter(pk=payment.pk).update(status='failed')
+        kept.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_enrollment_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_pending, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('status', 'pending')), fields=('user', 'course'),
+                name='payment_one_pending_per_course',
+            ),
+        ),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.utils.text import slugify
 
+from .storage import get_lesson_media_storage
+
 class User(AbstractUser):
     USER_TYPES = (
         ('student', 'Étudiant'),
@@ -11,10 +14,16 @@ class User(AbstractUser):
     user_type = models.CharField(max_length=20, choices=USER_TYPES, default='student')
     phone = models.CharField(max_length=20, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True)
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['user_type', 'id'], name='user_type_id_idx'),
+        ]
+
+CYCLE_ERROR = "Une catégorie ne peut pas être rattachée à l'une de ses sous-catégories."
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -25,15 +34,48 @@ class Category(models.Model):
     display_order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Synchronisation incrémentale
+    # Chemin matérialisé ("0000000001/0000000004/") maintenu à l'enregistrement
+    path = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        # Un cycle détecté par update_path annule aussi le changement de parent
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_path()
+
+    def clean(self):
+        super().clean()
+        if self.path and self._parent_path().startswith(self.path):
+            raise ValidationError({'parent': CYCLE_ERROR})
+
+    def _parent_path(self):
+        if not self.parent_id:
+            return ''
+        return Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or ''
+
+    def update_path(self):
+        from .tree import move_subtree
+
+        parent_path = self._parent_path()
+        if self.path and parent_path.startswith(self.path):
+            # Dernier garde-fou (enregistrement hors formulaire) : clean() signale le cycle avant
+            raise ValueError(CYCLE_ERROR)
+        new_path = f"{parent_path}{self.pk:010d}/"
+        if new_path != self.path:
+            move_subtree(self, new_path)
+            self.path, self.depth = new_path, new_path.count('/') - 1
 
     class Meta:
         verbose_name_plural = 'Categories'
         ordering = ['display_order', 'name']
+        indexes = [
+            models.Index(fields=['display_order', 'name'], condition=models.Q(is_active=True),
+                         name='category_active_order_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -50,17 +92,54 @@ class Course(models.Model):
     instructor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='courses')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     thumbnail = models.ImageField(upload_to='course_thumbnails/', blank=True, null=True)
+    # Déclinaisons redimensionnées (WebP/JPEG) produites par core.tasks.process_image_variants
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='beginner')
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     currency = models.CharField(max_length=10, default='XAF')
     is_published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Texte normalisé (titre, description, catégorie, leçons) indexé par core.search
+    search_document = models.TextField(blank=True, default='', editable=False)
+    # Compteurs dénormalisés, tenus à jour par F() (core.stats) et recalculables
+    # via la commande reconcile_course_stats
+    lessons_count = models.IntegerField(default=0, editable=False)
+    enrollments_count = models.IntegerField(default=0, editable=False)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    progress_total = models.BigIntegerField(default=0, editable=False)  # Somme des progressions
+    STATS_FIELDS = ('lessons_count', 'enrollments_count', 'revenue', 'progress_total')
+    # Écrits par les tâches de fond (core.search, core.tasks) via update()/bulk_update()
+    DERIVED_FIELDS = ('thumbnail_variants', 'search_document')
+
+    @property
+    def average_progress(self):
+        if not self.enrollments_count:
+            return 0
+        return self.progress_total // self.enrollments_count
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Une instance chargée avant une inscription (ou avant l'indexation, les déclinaisons
+            # d'image) ne doit pas écraser les compteurs ni les champs dérivés
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STATS_FIELDS + self.DERIVED_FIELDS
+            ]
         super().save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            # Catalogue public : cours publiés, du plus récent au plus ancien
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_published=True),
+                         name='course_published_created_idx'),
+            # Repli des recommandations : cours les plus suivis d'une catégorie
+            models.Index(fields=['category', '-enrollments_count'], condition=models.Q(is_published=True),
+                         name='course_category_popular_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -69,10 +148,18 @@ class Lesson(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField(blank=True)
     video_url = models.URLField(blank=True)
+    # Vidéo ou pièce jointe privée : distribuée par liens signés (core.media)
+    media_file = models.FileField(upload_to='lessons/%Y/%m/', storage=get_lesson_media_storage, blank=True)
     display_order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['display_order']
+        indexes = [
+            models.Index(fields=['course', 'display_order'], name='lesson_course_order_idx'),
+            # Synchronisation : leçons modifiées des cours suivis
+            models.Index(fields=['course', 'updated_at'], name='lesson_course_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -82,13 +169,36 @@ class Enrollment(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     enrolled_at = models.DateTimeField(auto_now_add=True)
     progress = models.IntegerField(default=0)  # Pourcentage de progression
+    completed_lessons = models.IntegerField(default=0)  # Maintenu par core.progress
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'course')
+        indexes = [
+            models.Index(fields=['user', '-enrolled_at'], name='enrollment_user_date_idx'),
+            # Agrégation quotidienne (core.stats.rollup_daily_stats) par plage de dates
+            models.Index(fields=['enrolled_at'], name='enrollment_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='enrollment_user_updated_idx'),
+            # Agrégat quotidien : cours dont les inscriptions ont changé depuis le dernier passage
+            models.Index(fields=['updated_at'], name='enrollment_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} inscrit à {self.course.title}"
 
+class LessonProgress(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lesson_progress')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='progress')
+    position = models.PositiveIntegerField(default=0)  # Position de lecture en secondes
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'lesson')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.lesson.title}"
+
 class Payment(models.Model):
     STATUS_CHOICES = (
         ('pending', 'En attente'),
@@ -102,5 +212,72 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='payment_status_created_idx'),
+            models.Index(fields=['created_at'], name='payment_created_idx'),
+        ]
+        constraints = [
+            # Un seul paiement en attente par cours et par utilisateur (double clic, POST rejoué)
+            models.UniqueConstraint(
+                fields=['user', 'course'], condition=models.Q(status='pending'),
+                name='payment_one_pending_per_course',
+            ),
+        ]
+
     def __str__(self):
         return f"Paiement {self.transaction_id} - {self.status}"
+
+class CourseDailyStats(models.Model):
+    # Agrégats quotidiens par cours, calculés par core.stats.rollup_daily_stats
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    currency = models.CharField(max_length=10, default='XAF')  # Devise du cours
+    enrollments = models.IntegerField(default=0)
+    payments = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Répartition des inscrits par progression (cf. core.stats.PROGRESS_BUCKETS), relevée le jour du calcul
+    progress_distribution = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'Course daily stats'
+        unique_together = ('course', 'day')
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.course.title} - {self.day}"
+
+class Tombstone(models.Model):
+    # Trace des suppressions, relue par /api/sync/ puis purgée (core.sync.prune_tombstones)
+    MODEL_CHOICES = (
+        ('category', 'Catégorie'),
+        ('course', 'Cours'),
+        ('lesson', 'Leçon'),
+        ('enrollment', 'Inscription'),
+    )
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    # Identifiants bruts (pas de clé étrangère) : le cours ou l'utilisateur peut avoir disparu
+    course_id = models.BigIntegerField(null=True, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} supprimé le {self.deleted_at:%Y-%m-%d}"
+
+class CourseSimilarity(models.Model):
+    # K plus proches voisins de chaque cours (co-inscriptions), calculés par core.recommendations
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='similarities')
+    similar = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name_plural = 'Course similarities'
+        unique_together = ('course', 'similar')
+        indexes = [
+            models.Index(fields=['course', 'rank'], name='similarity_course_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} -> {self.similar_id} ({self.score:.3f})"
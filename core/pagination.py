@@ -0,0 +1,31 @@
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    # Pagination par clé (id) : coût constant même avec des centaines de milliers de comptes
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    ordering = 'id'
+
+
+class CourseCursorPagination(CursorPagination):
+    # Pagination par curseur : coût constant quelle que soit la page demandée
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+
+class LessonCursorPagination(CursorPagination):
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    ordering = ('display_order', 'id')
+
+
+class ProgressCursorPagination(CursorPagination):
+    page_size = 100
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    ordering = ('-updated_at', '-id')
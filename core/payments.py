@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.module_loading import import_string
+
+from .models import Enrollment, Payment
+from .stats import adjust_course_stats
+
+
+class ProviderError(Exception):
+    # Erreur transitoire du fournisseur : la tâche sera relancée
+    pass
+
+
+class LocalProvider:
+    # Simulation locale : le paiement est confirmé immédiatement
+    def charge(self, payment):
+        return 'completed'
+
+
+class DeferredLocalProvider:
+    # Simulation d'un fournisseur qui confirme plus tard par webhook (Mobile Money)
+    def charge(self, payment):
+        return 'pending'
+
+
+def get_provider():
+    return import_string(settings.PAYMENT_PROVIDER)()
+
+
+def sign_payload(body):
+    return hmac.new(settings.PAYMENT_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature):
+    return hmac.compare_digest(sign_payload(body), signature or '')
+
+
+def start_payment(user, course):
+    from .tasks import process_payment
+
+    # Paiement déjà en attente pour ce cours : renvoyé tel quel, le fournisseur n'est pas rappelé
+    pending = Payment.objects.filter(user=user, course=course, status='pending').first()
+    if pending:
+        return pending
+    try:
+        with transaction.atomic():
+            payment = Payment.objects.create(
+                user=user, course=course, amount=course.price,
+                transaction_id=f"TS-{uuid.uuid4().hex}",
+            )
+            if not course.price:
+                # Cours gratuit : aucun appel au fournisseur
+                return apply_payment_status(payment.transaction_id, 'completed')
+            # Le fournisseur est appelé hors de la requête, une fois la transaction validée
+            transaction.on_commit(lambda: process_payment.delay(payment.pk))
+    except IntegrityError:
+        # Requête concurrente : son paiement en attente fait foi (payment_one_pending_per_course)
+        return Payment.objects.get(user=user, course=course, status='pending')
+    return payment
+
+
+@transaction.atomic
+def apply_payment_status(transaction_id, status):
+    # Idempotent : un paiement déjà finalisé n'est plus modifié (webhooks rejoués)
+    payment = Payment.objects.select_for_update().get(transaction_id=transaction_id)
+    if payment.status != 'pending' or status == 'pending':
+        return payment
+    payment.status = status
+    payment.save(update_fields=['status'])
+    if status == 'completed':
+        _, created = Enrollment.objects.get_or_create(user_id=payment.user_id, course_id=payment.course_id)
+        # Déjà inscrit (autre paiement, inscription manuelle) : le revenu n'est pas compté deux fois
+        if created:
+            adjust_course_stats(payment.course_id, revenue=payment.amount)
+    return payment
@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+from .models import Course, Enrollment, Lesson, LessonProgress
+from .stats import adjust_course_counter, refresh_progress_total
+
+
+def coalesce_events(events):
+    # Plusieurs événements pour une même leçon : dernière position connue, « terminée » l'emporte.
+    # position None : aucun événement ne la donne, la valeur enregistrée est conservée
+    merged = {}
+    for event in events:
+        current = merged.setdefault(event['lesson'], {'position': None, 'completed': False})
+        if event.get('position') is not None:
+            current['position'] = event['position']
+        current['completed'] = current['completed'] or event.get('completed', False)
+    return merged
+
+
+@transaction.atomic
+def record_progress(user, events):
+    merged = coalesce_events(events)
+    lesson_courses = dict(Lesson.objects.filter(pk__in=merged).values_list('id', 'course_id'))
+    enrollments = {
+        enrollment.course_id: enrollment
+        for enrollment in Enrollment.objects.select_for_update().filter(
+            user=user, course_id__in=set(lesson_courses.values())
+        )
+    }
+    accepted = {
+        lesson_id: event for lesson_id, event in merged.items()
+        if lesson_courses.get(lesson_id) in enrollments
+    }
+    rejected = sorted(set(merged) - set(accepted))
+    if not accepted:
+        return {'accepted': 0, 'rejected': rejected, 'enrollments': []}
+
+    stored = {
+        lesson_id: (position, completed)
+        for lesson_id, position, completed in LessonProgress.objects.filter(user=user, lesson_id__in=accepted)
+        .values_list('lesson_id', 'position', 'completed')
+    }
+    already_completed = {lesson_id for lesson_id, (_, completed) in stored.items() if completed}
+    LessonProgress.objects.bulk_create(
+        [
+            LessonProgress(
+                user=user, lesson_id=lesson_id,
+                position=event['position'] if event['position'] is not None else stored.get(lesson_id, (0,))[0],
+                completed=event['completed'] or lesson_id in already_completed,
+            )
+            for lesson_id, event in accepted.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['user', 'lesson'],
+        update_fields=['position', 'completed', 'updated_at'],
+    )
+
+    # Mise à jour incrémentale : seules les leçons nouvellement terminées comptent
+    newly_completed = {}
+    for lesson_id, event in accepted.items():
+        if event['completed'] and lesson_id not in already_completed:
+            course_id = lesson_courses[lesson_id]
+            newly_completed[course_id] = newly_completed.get(course_id, 0) + 1
+
+    changed = [enrollments[course_id] for course_id in newly_completed]
+    if changed:
+        totals = dict(Course.objects.filter(pk__in=newly_completed).values_list('id', 'lessons_count'))
+        progress_deltas = {}
+        now = timezone.now()
+        for enrollment in changed:
+            previous = enrollment.progress
+            enrollment.completed_lessons += newly_completed[enrollment.course_id]
+            total = totals.get(enrollment.course_id) or 1
+            enrollment.progress = min(100, enrollment.completed_lessons * 100 // total)
+            progress_deltas[enrollment.course_id] = enrollment.progress - previous
+            enrollment.updated_at = now  # bulk_update ignore auto_now
+        Enrollment.objects.bulk_update(changed, ['completed_lessons', 'progress', 'updated_at'])
+        adjust_course_counter('progress_total', progress_deltas)
+
+    return {
+        'accepted': len(accepted),
+        'rejected': rejected,
+        'enrollments': [
+            {'course': enrollment.course_id, 'progress': enrollment.progress}
+            for enrollment in enrollments.values()
+        ],
+    }
+
+
+def lessons_changed(course_id, uncompleted_by=()):
+    # Leçon ajoutée ou supprimée (lessons_count déjà ajusté) : les leçons terminées d'une leçon
+    # supprimée sont retirées, puis la progression du cours est recalculée en un UPDATE groupé
+    now = timezone.now()
+    if uncompleted_by:
+        Enrollment.objects.filter(
+            course_id=course_id, user_id__in=uncompleted_by, completed_lessons__gt=0,
+        ).update(completed_lessons=F('completed_lessons') - 1, updated_at=now)
+    total = Course.objects.filter(pk=course_id).values_list('lessons_count', flat=True).first() or 1
+    progress = Least(F('completed_lessons') * 100 / total, Value(100))
+    if Enrollment.objects.filter(course_id=course_id).exclude(progress=progress).update(
+        progress=progress, updated_at=now,
+    ):
+        refresh_progress_total(course_id)
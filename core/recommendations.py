@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Sum, Value, When
+
+from .cache import bump_catalog_version
+from .models import Course, CourseSimilarity, Enrollment
+
+
+def _enrollment_matrix(chunk_size):
+    # Matrice creuse utilisateurs x cours (1 = inscrit), lue par paquets sans instancier de modèles
+    import numpy as np
+    from scipy import sparse
+
+    course_ids = np.fromiter(Course.objects.order_by('pk').values_list('pk', flat=True), dtype=np.int64)
+    pairs = Enrollment.objects.order_by().values_list('user_id', 'course_id').iterator(chunk_size=chunk_size)
+    flat = np.fromiter((value for pair in pairs for value in pair), dtype=np.int64)
+    users, courses = flat[0::2], flat[1::2]
+    user_index = np.unique(users, return_inverse=True)[1]
+    course_index = np.searchsorted(course_ids, courses)
+    matrix = sparse.csc_matrix(
+        (np.ones(len(users), dtype=np.float32), (user_index, course_index)),
+        shape=(user_index.max() + 1 if len(users) else 0, len(course_ids)),
+    )
+    return course_ids, matrix
+
+
+def compute_similarities(top_k=None, batch_size=500, min_support=1, chunk_size=10000):
+    # Similarité cosinus item-item sur les co-inscriptions : co(i, j) / sqrt(n_i * n_j).
+    # Calcul par blocs de `batch_size` cours (X[:, bloc].T @ X) : mémoire bornée par le bloc.
+    import numpy as np
+
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    course_ids, matrix = _enrollment_matrix(chunk_size)
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    rows = []
+    for start in range(0, len(course_ids), batch_size):
+        block = (matrix[:, start:start + batch_size].T @ matrix).tocsr()
+        block.sort_indices()
+        for offset in range(block.shape[0]):
+            i = start + offset
+            cells = slice(block.indptr[offset], block.indptr[offset + 1])
+            indices, data = block.indices[cells], block.data[cells]
+            keep = (indices != i) & (data >= min_support)
+            neighbours, co = indices[keep], data[keep]
+            if not len(neighbours):
+                continue
+            scores = co / np.sqrt(counts[i] * counts[neighbours])
+            best = np.argsort(-scores, kind='stable')[:top_k]
+            rows.extend(
+                (int(course_ids[i]), int(course_ids[neighbours[j]]), float(scores[j]), rank)
+                for rank, j in enumerate(best)
+            )
+    return rows
+
+
+@transaction.atomic
+def build_recommendations(top_k=None, batch_size=500, min_support=1):
+    rows = compute_similarities(top_k=top_k, batch_size=batch_size, min_support=min_support)
+    # Remplacement complet de la table, invisible des lecteurs jusqu'au commit
+    CourseSimilarity.objects.all().delete()
+    CourseSimilarity.objects.bulk_create(
+        [CourseSimilarity(course_id=course, similar_id=similar, score=score, rank=rank)
+         for course, similar, score, rank in rows],
+        batch_size=2000,
+    )
+    transaction.on_commit(bump_catalog_version)
+    return len(rows)
+
+
+def popular_courses(queryset, category_id=None, level=None, exclude=(), limit=10):
+    # Repli (démarrage à froid) : cours les plus suivis, même catégorie et même niveau d'abord
+    queryset = queryset.exclude(pk__in=exclude)
+    ordering = ['-enrollments_count', '-id']
+    if category_id:
+        queryset = queryset.filter(category_id=category_id)
+    if level:
+        ordering.insert(0, Case(When(level=level, then=Value(0)), default=Value(1), output_field=IntegerField()))
+    return list(queryset.order_by(*ordering)[:limit])
+
+
+def related_courses(queryset, course, limit=10):
+    neighbours = list(
+        queryset.filter(neighbour_of__course=course).order_by('neighbour_of__rank')[:limit]
+    )
+    if not neighbours:
+        return popular_courses(queryset, course.category_id, course.level, exclude=[course.pk], limit=limit)
+    return neighbours
+
+
+def recommended_courses(queryset, user, limit=10):
+    # Somme des similarités avec les cours déjà suivis, lue dans la table précalculée
+    enrolled = Enrollment.objects.filter(user=user).values('course_id')
+    scores = (
+        CourseSimilarity.objects.filter(course_id__in=enrolled).exclude(similar_id__in=enrolled)
+        .values('similar_id').annotate(total=Sum('score')).order_by('-total', 'similar_id')
+    )
+    ranked = [item['similar_id'] for item in scores[:limit * 2]]
+    courses = queryset.in_bulk(ranked)
+    picks = [courses[pk] for pk in ranked if pk in courses][:limit]
+    if not picks:
+        return popular_courses(queryset, exclude=enrolled.values_list('course_id', flat=True), limit=limit)
+    return picks
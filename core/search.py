@@ -0,0 +1,133 @@
+import re
+import unicodedata
+from functools import reduce
+
+from django.db import connection
+from django.db.models import Case, Q, When
+
+FTS_TABLE = 'core_course_fts'
+FTS_CANDIDATES = 500
+
+
+def normalize(text):
+    # Minuscules sans accents : « Développement » et « developpement » se confondent
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+
+def build_document(title, description, category_name, lesson_titles):
+    return normalize(' '.join([title, description, category_name or '', *lesson_titles]))
+
+
+def fts_supported(conn):
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def create_index(schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS core_course_search_gin ON core_course "
+            "USING GIN (to_tsvector('french'::regconfig, COALESCE(search_document, '')))"
+        )
+    elif fts_supported(conn):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(document, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_index(schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS core_course_search_gin")
+    elif conn.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _has_fts_table():
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def write_fts(documents):
+    # documents : {course_id: document} ; réécrit les lignes FTS correspondantes
+    if not documents or not _has_fts_table():
+        return
+    ids = list(documents)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(ids))})", ids
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)",
+            [(pk, doc) for pk, doc in documents.items() if doc is not None],
+        )
+
+
+def index_courses(course_ids):
+    from .models import Course, Lesson
+
+    courses = list(
+        Course.objects.filter(pk__in=course_ids).select_related('category')
+        .only('id', 'title', 'description', 'category__name')
+    )
+    if not courses:
+        return
+    titles = {}
+    lessons = (
+        Lesson.objects.filter(course_id__in=[c.pk for c in courses])
+        .order_by('course_id', 'display_order').values_list('course_id', 'title')
+    )
+    for course_id, title in lessons:
+        titles.setdefault(course_id, []).append(title)
+    for course in courses:
+        course.search_document = build_document(
+            course.title, course.description,
+            course.category.name if course.category else '', titles.get(course.pk, []),
+        )
+    Course.objects.bulk_update(courses, ['search_document'])
+    write_fts({course.pk: course.search_document for course in courses})
+
+
+def unindex_course(course_id):
+    write_fts({course_id: None})
+
+
+def search_courses(queryset, query, limit):
+    terms = re.findall(r'\w+', normalize(query))
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        # Même expression que l'index GIN core_course_search_gin
+        vector = SearchVector('search_document', config='french')
+        tsquery = SearchQuery(' & '.join(f"{term}:*" for term in terms), config='french', search_type='raw')
+        return (
+            queryset.annotate(search=vector, rank=SearchRank(vector, tsquery))
+            .filter(search=tsquery).order_by('-rank', '-created_at')[:limit]
+        )
+
+    if _has_fts_table():
+        match = ' '.join(f'"{term}"*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+                [match, FTS_CANDIDATES],
+            )
+            ranked = [row[0] for row in cursor.fetchall()]
+        if not ranked:
+            return queryset.none()
+        order = Case(*[When(pk=pk, then=position) for position, pk in enumerate(ranked)])
+        return queryset.filter(pk__in=ranked).order_by(order)[:limit]
+
+    # Repli sans index plein texte : recherche sur le document normalisé
+    condition = reduce(lambda acc, term: acc & Q(search_document__contains=term), terms, Q())
+    return queryset.filter(condition).order_by('-created_at')[:limit]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import User, Category, Course, Lesson
+from .models import User, Category, Course, Lesson, LessonProgress, Enrollment, Payment
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -8,8 +8,8 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name',
-                  'user_type', 'phone', 'avatar', 'bio', 'password')
-        read_only_fields = ('id',)
+                  'user_type', 'phone', 'avatar', 'avatar_variants', 'bio', 'password')
+        read_only_fields = ('id', 'avatar_variants')
 
     def create(self, validated_data):
         password = validated_data.pop('password', None)
@@ -38,16 +38,172 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class LessonSerializer(serializers.ModelSerializer):
+    # Le fichier n'a pas d'URL publique : lien signé via /api/lessons/<id>/media/
+    has_media = serializers.SerializerMethodField()
+
     class Meta:
         model = Lesson
         fields = '__all__'
+        extra_kwargs = {'media_file': {'write_only': True}}
+
+    def get_has_media(self, obj):
+        return bool(obj.media_file)
+
+
+class InstructorOnlyDecimalField(serializers.DecimalField):
+    # Omis de la réponse sauf pour l'instructeur du cours et l'équipe
+
+    def get_attribute(self, instance):
+        user = getattr(self.context.get('request'), 'user', None)
+        if not (user and (user.is_staff or user.pk == instance.instructor_id)):
+            raise serializers.SkipField()
+        return super().get_attribute(instance)
 
 
 class CourseSerializer(serializers.ModelSerializer):
     instructor_name = serializers.ReadOnlyField(source='instructor.get_full_name')
     category_name = serializers.ReadOnlyField(source='category.name')
     lessons = LessonSerializer(many=True, read_only=True)
+    average_progress = serializers.IntegerField(read_only=True)
+    revenue = InstructorOnlyDecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = Course
-        fields = '__all__'
+        # Liste explicite : les colonnes internes (search_document, progress_total) ne sont pas exposées
+        fields = ('id', 'title', 'slug', 'description', 'instructor', 'instructor_name', 'category',
+                  'category_name', 'thumbnail', 'thumbnail_variants', 'level', 'price', 'currency',
+                  'is_published', 'created_at', 'updated_at', 'lessons', 'lessons_count',
+                  'enrollments_count', 'revenue', 'average_progress')
+
+
+class CourseListSerializer(serializers.ModelSerializer):
+    # Version allégée pour le catalogue : pas de contenu de leçons, juste leur nombre
+    instructor_name = serializers.ReadOnlyField(source='instructor.get_full_name')
+    category_name = serializers.ReadOnlyField(source='category.name')
+    average_progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ('id', 'title', 'slug', 'description', 'instructor', 'instructor_name',
+                  'category', 'category_name', 'thumbnail', 'thumbnail_variants', 'level', 'price', 'currency',
+                  'is_published', 'created_at', 'lessons_count', 'enrollments_count', 'average_progress')
+
+
+class CourseSyncSerializer(serializers.ModelSerializer):
+    instructor_name = serializers.ReadOnlyField(source='instructor.get_full_name')
+
+    class Meta:
+        model = Course
+        fields = ('id', 'title', 'slug', 'description', 'instructor', 'instructor_name', 'category',
+                  'thumbnail', 'thumbnail_variants', 'level', 'price', 'currency', 'is_published',
+                  'lessons_count', 'updated_at')
+
+
+class EnrollmentSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Enrollment
+        fields = ('id', 'course', 'enrolled_at', 'progress', 'completed_lessons', 'updated_at')
+
+
+class LessonImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Lesson
+        fields = ('title', 'content', 'video_url', 'display_order')
+
+
+class CourseImportSerializer(serializers.ModelSerializer):
+    # Identifiants simples : catégories et instructeurs sont vérifiés en bloc par le lot
+    slug = serializers.SlugField(required=False, allow_blank=True)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    instructor = serializers.IntegerField(required=False)
+    lessons = LessonImportSerializer(many=True, required=False, default=list, max_length=500)
+
+    class Meta:
+        model = Course
+        fields = ('title', 'slug', 'description', 'category', 'instructor', 'level', 'price', 'currency',
+                  'is_published', 'lessons')
+
+
+class CourseImportBatchSerializer(serializers.Serializer):
+    courses = CourseImportSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_courses(self, courses):
+        # Contexte : 'user' (auteur de l'import, API) ou allow_any_instructor=True (commande d'exploitation)
+        allow_any_instructor = self.context.get('allow_any_instructor') or self.context['user'].is_staff
+        categories = Category.objects.in_bulk({data['category'] for data in courses if data.get('category')})
+        instructor_ids = {data['instructor'] for data in courses if data.get('instructor')}
+        if instructor_ids and not allow_any_instructor:
+            raise serializers.ValidationError("Seule l'équipe peut importer des cours pour un autre instructeur.")
+        instructors = User.objects.filter(user_type='instructor').in_bulk(instructor_ids)
+        errors = []
+        for data in courses:
+            error = {}
+            if data.get('category'):
+                data['category'] = categories.get(data['category'])
+                if data['category'] is None:
+                    error['category'] = ["Catégorie inconnue."]
+            if data.get('instructor'):
+                data['instructor'] = instructors.get(data['instructor'])
+                if data['instructor'] is None:
+                    error['instructor'] = ["Instructeur inconnu."]
+            errors.append(error)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return courses
+
+
+class LessonProgressSerializer(serializers.ModelSerializer):
+    course = serializers.ReadOnlyField(source='lesson.course_id')
+
+    class Meta:
+        model = LessonProgress
+        fields = ('lesson', 'course', 'position', 'completed', 'updated_at')
+
+
+class ProgressEventSerializer(serializers.Serializer):
+    lesson = serializers.IntegerField()
+    # Absent (événement « terminée » seul) : la position enregistrée est conservée
+    position = serializers.IntegerField(min_value=0, required=False)
+    completed = serializers.BooleanField(default=False)
+
+
+class ProgressBatchSerializer(serializers.Serializer):
+    events = ProgressEventSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class PaymentSerializer(serializers.ModelSerializer):
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.filter(is_published=True))
+
+    class Meta:
+        model = Payment
+        fields = ('id', 'course', 'amount', 'transaction_id', 'status', 'created_at')
+        read_only_fields = ('id', 'amount', 'transaction_id', 'status', 'created_at')
+
+    def validate_course(self, course):
+        user = self.context['request'].user
+        if Enrollment.objects.filter(user=user, course=course).exists():
+            raise serializers.ValidationError("Vous êtes déjà inscrit à ce cours.")
+        return course
+
+
+class PaymentWebhookSerializer(serializers.Serializer):
+    transaction_id = serializers.CharField(max_length=100)
+    status = serializers.ChoiceField(choices=('completed', 'failed'))
+
+
+class DailyStatsSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    currency = serializers.CharField()
+    enrollments = serializers.IntegerField()
+    payments = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class CourseStatsSummarySerializer(serializers.Serializer):
+    id = serializers.IntegerField(source='course_id')
+    title = serializers.CharField(source='course__title')
+    currency = serializers.CharField()
+    enrollments = serializers.IntegerField()
+    payments = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    progress_distribution = serializers.ListField(child=serializers.IntegerField())
@@ -0,0 +1,164 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import progress, search, stats
+from .authentication import invalidate_cached_user
+from .cache import bump_catalog_version
+from .images import needs_processing
+from .models import User, Category, Course, Lesson, Enrollment, Payment, Tombstone
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog_version()
+
+
+# Index de recherche : mis à jour uniquement pour les cours concernés
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, **kwargs):
+    search.index_courses([instance.pk])
+
+
+@receiver(post_delete, sender=Course)
+def unindex_course(sender, instance, **kwargs):
+    search.unindex_course(instance.pk)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def index_lesson_course(sender, instance, origin=None, **kwargs):
+    # Suppression en cascade depuis le cours : le cours sort de l'index de toute façon
+    if isinstance(origin, Course):
+        return
+    search.index_courses([instance.course_id])
+
+
+@receiver(post_save, sender=Category)
+def index_category_courses(sender, instance, created, **kwargs):
+    if not created:
+        search.index_courses(list(instance.course_set.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_courses(sender, instance, **kwargs):
+    instance._indexed_course_ids = list(instance.course_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def index_orphaned_courses(sender, instance, **kwargs):
+    search.index_courses(getattr(instance, '_indexed_course_ids', []))
+
+
+# Compteurs dénormalisés du cours (suppressions en cascade depuis le cours ignorées)
+
+@receiver(post_save, sender=Lesson)
+def count_lesson(sender, instance, created, **kwargs):
+    if created:
+        stats.adjust_course_stats(instance.course_id, lessons_count=1)
+        progress.lessons_changed(instance.course_id)
+
+
+@receiver(pre_delete, sender=Lesson)
+def remember_lesson_completions(sender, instance, origin=None, **kwargs):
+    # Avant la cascade sur LessonProgress : inscrits ayant terminé la leçon
+    if not isinstance(origin, Course):
+        instance._completed_by = list(instance.progress.filter(completed=True).values_list('user_id', flat=True))
+
+
+@receiver(post_delete, sender=Lesson)
+def uncount_lesson(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, Course):
+        stats.adjust_course_stats(instance.course_id, lessons_count=-1)
+        progress.lessons_changed(instance.course_id, getattr(instance, '_completed_by', ()))
+
+
+@receiver(post_save, sender=Enrollment)
+def count_enrollment(sender, instance, created, **kwargs):
+    if created:
+        stats.adjust_course_stats(instance.course_id, enrollments_count=1, progress_total=instance.progress)
+
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_enrollment(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, Course):
+        stats.adjust_course_stats(instance.course_id, enrollments_count=-1, progress_total=-instance.progress)
+
+
+@receiver(post_save, sender=Payment)
+def count_payment(sender, instance, created, **kwargs):
+    # Les passages pending -> completed sont comptés par core.payments.apply_payment_status
+    if created and instance.status == 'completed':
+        stats.adjust_course_stats(instance.course_id, revenue=instance.amount)
+
+
+@receiver(post_delete, sender=Payment)
+def uncount_payment(sender, instance, origin=None, **kwargs):
+    if instance.status == 'completed' and not isinstance(origin, Course):
+        stats.adjust_course_stats(instance.course_id, revenue=-instance.amount)
+
+
+# Traces de suppression pour la synchronisation incrémentale (/api/sync/) ;
+# les suppressions en cascade sont couvertes par la trace de l'objet parent, sauf les inscriptions
+# d'un cours supprimé : leurs traces désignent les utilisateurs qui doivent recevoir celle du cours
+
+@receiver(post_delete, sender=Category)
+def tombstone_category(sender, instance, **kwargs):
+    Tombstone.objects.create(model='category', object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Course)
+def tombstone_course_enrollments(sender, instance, origin=None, **kwargs):
+    # En une requête, avant la cascade ; un utilisateur supprimé (origin) n'a plus rien à synchroniser
+    enrollments = instance.enrollments.all()
+    if isinstance(origin, User):
+        enrollments = enrollments.exclude(user_id=origin.pk)
+    Tombstone.objects.bulk_create([
+        Tombstone(model='enrollment', object_id=pk, course_id=instance.pk, user_id=user_id)
+        for pk, user_id in enrollments.values_list('pk', 'user_id')
+    ])
+
+
+@receiver(post_delete, sender=Course)
+def tombstone_course(sender, instance, **kwargs):
+    Tombstone.objects.create(model='course', object_id=instance.pk, course_id=instance.pk)
+
+
+@receiver(post_delete, sender=Lesson)
+def tombstone_lesson(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, Course):
+        Tombstone.objects.create(model='lesson', object_id=instance.pk, course_id=instance.course_id)
+
+
+@receiver(post_delete, sender=Enrollment)
+def tombstone_enrollment(sender, instance, origin=None, **kwargs):
+    # Cascade d'un cours (y compris ceux d'un instructeur supprimé) : tracée par
+    # tombstone_course_enrollments ; cascade de l'utilisateur inscrit : plus de client à synchroniser
+    if not isinstance(origin, (Course, User)):
+        Tombstone.objects.create(model='enrollment', object_id=instance.pk,
+                                 course_id=instance.course_id, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    # Après validation : une lecture concurrente ne remet pas l'ancienne ligne en cache
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=User)
+def schedule_image_variants(sender, instance, **kwargs):
+    from .tasks import process_image_variants
+
+    label = sender._meta.label
+    if needs_processing(instance, label):
+        transaction.on_commit(lambda: process_image_variants.delay(label, instance.pk))
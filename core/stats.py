@@ -0,0 +1,198 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .cache import bump_catalog_counters
+from .models import Course, CourseDailyStats, Enrollment, Payment, Tombstone
+
+# Tranches de progression (bornes incluses) des tableaux de bord instructeur
+PROGRESS_BUCKETS = ((0, 0), (1, 24), (25, 49), (50, 74), (75, 99), (100, 100))
+
+
+def adjust_course_stats(course_id, **deltas):
+    # Mise à jour atomique côté base : pas de lecture préalable, pas de course entre workers
+    deltas = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if deltas:
+        Course.objects.filter(pk=course_id).update(**deltas)
+        transaction.on_commit(bump_catalog_counters)
+
+
+def adjust_course_counter(field, deltas):
+    # Variante groupée : {course_id: delta} appliqué en une seule requête UPDATE
+    deltas = {course_id: delta for course_id, delta in deltas.items() if delta}
+    if deltas:
+        Course.objects.filter(pk__in=deltas).update(**{field: F(field) + Case(
+            *[When(pk=course_id, then=Value(delta)) for course_id, delta in deltas.items()],
+            default=Value(0),
+        )})
+        transaction.on_commit(bump_catalog_counters)
+
+
+def _aggregate(model, value, output_field=None, **filters):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(course=OuterRef('pk'), **filters).order_by()
+            .values('course').annotate(total=value).values('total')
+        ),
+        Value(0),
+        output_field=output_field or IntegerField(),
+    )
+
+
+def refresh_progress_total(course_id):
+    # Après une mise à jour groupée des progressions (core.progress.lessons_changed)
+    Course.objects.filter(pk=course_id).update(progress_total=_aggregate(Enrollment, Sum('progress')))
+    transaction.on_commit(bump_catalog_counters)
+
+
+def course_stats_expressions(apps=global_apps):
+    Lesson = apps.get_model('core', 'Lesson')
+    Enrollment = apps.get_model('core', 'Enrollment')
+    Payment = apps.get_model('core', 'Payment')
+    return {
+        'lessons_count': _aggregate(Lesson, Count('id')),
+        'enrollments_count': _aggregate(Enrollment, Count('id')),
+        'revenue': _aggregate(
+            Payment, Sum('amount'), DecimalField(max_digits=12, decimal_places=2), status='completed',
+        ),
+        'progress_total': _aggregate(Enrollment, Sum('progress')),
+    }
+
+
+def reconcile_course_stats(course_ids=None, dry_run=False, apps=global_apps):
+    # Recalcule les compteurs en une seule requête UPDATE ; renvoie le nombre de cours corrigés
+    model = apps.get_model('core', 'Course')
+    queryset = model.objects.all()
+    if course_ids is not None:
+        queryset = queryset.filter(pk__in=course_ids)
+    expressions = course_stats_expressions(apps)
+    drift = Q()
+    for field, expression in expressions.items():
+        drift |= ~Q(**{field: F(f'expected_{field}')})
+    drifted = (
+        queryset.annotate(**{f'expected_{field}': expression for field, expression in expressions.items()})
+        .filter(drift).count()
+    )
+    if drifted and not dry_run:
+        queryset.update(**expressions)
+    return drifted
+
+
+def day_range(start, end):
+    # Bornes datetime (fuseau courant) pour profiter des index sur enrolled_at / created_at
+    tz = timezone.get_current_timezone()
+    return (timezone.make_aware(datetime.combine(start, time.min), tz),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz))
+
+
+def _first_activity_day():
+    first = [
+        value for value in (
+            Enrollment.objects.aggregate(first=Min('enrolled_at'))['first'],
+            Payment.objects.filter(status='completed').aggregate(first=Min('created_at'))['first'],
+        ) if value
+    ]
+    return timezone.localdate(min(first)) if first else None
+
+
+def progress_distribution(course_ids=None):
+    queryset = Enrollment.objects.order_by()
+    if course_ids is not None:
+        queryset = queryset.filter(course_id__in=course_ids)
+    buckets = {
+        f'bucket_{index}': Count('id', filter=Q(progress__gte=low, progress__lte=high))
+        for index, (low, high) in enumerate(PROGRESS_BUCKETS)
+    }
+    return {
+        item['course_id']: [item[f'bucket_{index}'] for index in range(len(PROGRESS_BUCKETS))]
+        for item in queryset.values('course_id').annotate(**buckets)
+    }
+
+
+def changed_progress_courses(since):
+    # Cours dont des inscriptions ont été créées, modifiées ou supprimées depuis `since`
+    updated = Enrollment.objects.filter(updated_at__gte=since).order_by().values_list('course_id', flat=True)
+    deleted = Tombstone.objects.filter(model='enrollment', deleted_at__gte=since).values_list('course_id', flat=True)
+    return set(updated.distinct()) | set(deleted.distinct())
+
+
+def progress_snapshot(last):
+    # Répartition courante par cours. Après un premier agrégat, seuls les cours modifiés depuis
+    # le jour `last` sont relus ; les autres reprennent la répartition enregistrée ce jour-là.
+    # Un total différent du compteur enrollments_count (suppression en cascade d'un utilisateur,
+    # sans trace) force aussi le recalcul.
+    if last is None:
+        return progress_distribution()
+    previous = dict(
+        CourseDailyStats.objects.filter(day=last).exclude(progress_distribution=[])
+        .values_list('course_id', 'progress_distribution')
+    )
+    counts = dict(Course.objects.filter(pk__in=previous).values_list('id', 'enrollments_count'))
+    changed = changed_progress_courses(day_range(last, last)[1])
+    changed |= {course_id for course_id, buckets in previous.items() if sum(buckets) != counts.get(course_id)}
+    snapshot = {course_id: buckets for course_id, buckets in previous.items()
+                if course_id in counts and course_id not in changed}
+    snapshot.update(progress_distribution(changed))
+    return snapshot
+
+
+def rollup_daily_stats(until=None, overlap=2, batch_size=1000):
+    # Incrémental : seuls les jours complets postérieurs au dernier agrégat sont calculés,
+    # plus `overlap` jours déjà agrégés (paiements confirmés en retard par webhook)
+    until = until or timezone.localdate() - timedelta(days=1)
+    last = CourseDailyStats.objects.aggregate(last=Max('day'))['last']
+    start = last - timedelta(days=overlap - 1) if last else _first_activity_day()
+    if start is None or start > until:
+        return 0
+    begin, end = day_range(start, until)
+
+    rows = {}
+
+    def row(course_id, day):
+        return rows.setdefault((course_id, day), {'enrollments': 0, 'payments': 0, 'revenue': Decimal(0)})
+
+    enrollments = (
+        Enrollment.objects.filter(enrolled_at__gte=begin, enrolled_at__lt=end).order_by()
+        .values('course_id', day=TruncDate('enrolled_at')).annotate(total=Count('id'))
+    )
+    for item in enrollments:
+        row(item['course_id'], item['day'])['enrollments'] = item['total']
+    payments = (
+        Payment.objects.filter(status='completed', created_at__gte=begin, created_at__lt=end).order_by()
+        .values('course_id', day=TruncDate('created_at')).annotate(total=Count('id'), amount=Sum('amount'))
+    )
+    for item in payments:
+        values = row(item['course_id'], item['day'])
+        values['payments'], values['revenue'] = item['total'], item['amount']
+
+    # La répartition de progression est un instantané : rattachée au dernier jour agrégé
+    snapshot = progress_snapshot(last)
+    for course_id in snapshot:
+        row(course_id, until)
+
+    currencies = dict(Course.objects.filter(pk__in={key[0] for key in rows}).values_list('id', 'currency'))
+    stats = [
+        CourseDailyStats(
+            course_id=course_id, day=day, currency=currencies[course_id],
+            progress_distribution=snapshot.get(course_id, []) if day == until else [], **values,
+        )
+        for (course_id, day), values in rows.items() if course_id in currencies
+    ]
+    fields = ['currency', 'enrollments', 'payments', 'revenue']
+    # Les jours ré-agrégés conservent l'instantané de progression relevé à l'époque
+    for batch, update_fields in (
+        ([item for item in stats if item.day != until], fields),
+        ([item for item in stats if item.day == until], fields + ['progress_distribution']),
+    ):
+        CourseDailyStats.objects.bulk_create(
+            batch, batch_size=batch_size, update_conflicts=True,
+            unique_fields=['course', 'day'], update_fields=update_fields,
+        )
+    return len(stats)
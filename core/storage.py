@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.functional import LazyObject, empty
+from django.utils.module_loading import import_string
+
+
+class PrivateMediaStorage(FileSystemStorage):
+    # Hors de MEDIA_ROOT : jamais servi directement, uniquement via core.media.lesson_media
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('location', settings.PRIVATE_MEDIA_ROOT)
+        super().__init__(**kwargs)
+
+    @property
+    def base_url(self):
+        # storage.url() lève ValueError : aucune URL publique
+        return None
+
+
+class LessonMediaStorage(LazyObject):
+    # Classe choisie par LESSON_MEDIA_STORAGE (S3 via django-storages, ou disque privé)
+    def _setup(self):
+        self._wrapped = import_string(settings.LESSON_MEDIA_STORAGE)()
+
+
+lesson_media_storage = LessonMediaStorage()
+
+
+def get_lesson_media_storage():
+    # Callable référencé par Lesson.media_file (sérialisable dans les migrations)
+    return lesson_media_storage
+
+
+@receiver(setting_changed)
+def reset_lesson_media_storage(setting, **kwargs):
+    if setting in ('LESSON_MEDIA_STORAGE', 'PRIVATE_MEDIA_ROOT', 'MEDIA_ROOT'):
+        lesson_media_storage._wrapped = empty
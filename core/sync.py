@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Course, Enrollment, Lesson, Tombstone
+
+TOKEN_SALT = 'core.sync'
+# Marge couvrant les transactions validées après la lecture : quelques doublons plutôt qu'un oubli
+SAFETY_MARGIN = timedelta(seconds=30)
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def make_token(user, moment):
+    return signing.dumps({'u': user.pk, 't': moment.isoformat()}, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(user, token):
+    # None : jeton trop ancien (traces de suppression purgées), resynchronisation complète
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=timedelta(days=settings.SYNC_TOMBSTONE_DAYS))
+    except signing.SignatureExpired:
+        return None
+    except signing.BadSignature:
+        raise InvalidToken("Jeton de synchronisation invalide.")
+    if data.get('u') != user.pk:
+        raise InvalidToken("Jeton de synchronisation invalide.")
+    return parse_datetime(data['t'])
+
+
+def changes_since(user, since=None):
+    # Enregistrements modifiés (et supprimés) depuis `since` pour les cours suivis par `user` ;
+    # since=None : instantané complet
+    started = timezone.now()
+    enrollments = Enrollment.objects.filter(user=user)
+    course_ids = list(enrollments.values_list('course_id', flat=True))
+    categories = Category.objects.all()
+    courses = Course.objects.filter(pk__in=course_ids)
+    lessons = Lesson.objects.filter(course_id__in=course_ids)
+    deleted = {}
+    if since is not None:
+        # Nouvelles inscriptions : le cours et toutes ses leçons, même inchangés
+        new_ids = list(enrollments.filter(enrolled_at__gt=since).values_list('course_id', flat=True))
+        enrollments = enrollments.filter(updated_at__gt=since)
+        categories = categories.filter(updated_at__gt=since)
+        courses = courses.filter(Q(updated_at__gt=since) | Q(pk__in=new_ids))
+        lessons = lessons.filter(Q(updated_at__gt=since) | Q(course_id__in=new_ids))
+        tombstones = Tombstone.objects.filter(deleted_at__gt=since)
+        # Cours supprimés : seulement ceux que le client a pu recevoir (inscription tracée avec le cours)
+        removed = tombstones.filter(model='enrollment', user_id=user.pk).values('course_id')
+        tombstones = tombstones.filter(
+            Q(model='category')
+            | Q(model='course', object_id__in=removed)
+            | Q(model='lesson', course_id__in=course_ids)
+            | Q(model='enrollment', user_id=user.pk)
+        )
+        for model, object_id in tombstones.values_list('model', 'object_id'):
+            deleted.setdefault(model, []).append(object_id)
+    return {
+        'categories': categories.order_by('pk'),
+        'courses': courses.select_related('instructor').defer('search_document').order_by('pk'),
+        'lessons': lessons.order_by('course_id', 'display_order', 'pk'),
+        'enrollments': enrollments.order_by('pk'),
+        'deleted': deleted,
+        'token': make_token(user, started - SAFETY_MARGIN),
+    }
+
+
+def prune_tombstones(days=None):
+    days = settings.SYNC_TOMBSTONE_DAYS if days is None else days
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -0,0 +1,70 @@
+from celery import shared_task
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+from .authentication import invalidate_cached_user
+from .cache import bump_catalog_version
+from .images import IMAGE_FIELDS, delete_variants, generate_variants, needs_processing
+from .models import Payment
+from .payments import ProviderError, apply_payment_status, get_provider
+from .recommendations import build_recommendations
+from .stats import rollup_daily_stats
+from .sync import prune_tombstones
+
+
+@shared_task(autoretry_for=(ProviderError,), retry_backoff=True, max_retries=5)
+def process_payment(payment_id):
+    payment = Payment.objects.filter(pk=payment_id, status='pending').first()
+    if payment is None:
+        return
+    status = get_provider().charge(payment)
+    # 'pending' : le fournisseur confirmera via le webhook
+    if status in ('completed', 'failed'):
+        apply_payment_status(payment.transaction_id, status)
+
+
+@shared_task
+def process_image_variants(label, pk):
+    # Déclinaisons WebP/JPEG d'une image téléversée, générées hors de la requête
+    model = apps.get_model(label)
+    image_field, variants_field = IMAGE_FIELDS[label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_processing(instance, label):
+        return
+    field_file = getattr(instance, image_field)
+    variants = generate_variants(field_file) if field_file else {}
+    # Ne rien écraser si l'image a encore changé entre-temps
+    if field_file:
+        unchanged = Q(**{image_field: field_file.name})
+    else:
+        unchanged = Q(**{image_field: ''}) | Q(**{f'{image_field}__isnull': True})
+    values = {variants_field: variants}
+    if label == 'core.Course':
+        values['updated_at'] = timezone.now()  # Nouvelle miniature visible par /api/sync/
+    updated = model.objects.filter(unchanged, pk=pk).update(**values)
+    if not updated:
+        delete_variants(field_file.storage, variants)
+        return
+    delete_variants(field_file.storage, getattr(instance, variants_field))
+    if label == 'core.Course':
+        bump_catalog_version()
+    elif label == 'core.User':
+        # .update() ne déclenche pas post_save : l'utilisateur mis en cache garde les anciennes variantes
+        invalidate_cached_user(pk)
+
+
+@shared_task
+def rollup_course_stats():
+    # Planifiée chaque nuit par Celery beat (CELERY_BEAT_SCHEDULE)
+    return rollup_daily_stats()
+
+
+@shared_task
+def prune_sync_tombstones():
+    return prune_tombstones()
+
+
+@shared_task
+def rebuild_recommendations():
+    return build_recommendations()
@@ -1,3 +1,1415 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.db import connections
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache_key
+from .benchmarks import SCENARIOS, build_context, compare, run_scenario
+from .cache import COUNTERS_THROTTLE_KEY
+from .db_routers import CATALOG_PIN_KEY
+from .exports import stream_export
+from .loadgen import LoadGenerator
+from .metrics import registry
+from .middleware import PerformanceMiddleware
+from .payments import sign_payload
+from .recommendations import build_recommendations
+from .stats import reconcile_course_stats, rollup_daily_stats
+from .tasks import process_image_variants
+from .views import _rendered_shell
+from .models import (
+    User, Category, Course, CourseDailyStats, CourseSimilarity, Lesson, Enrollment, LessonProgress, Payment,
+    Tombstone,
+)
+
+
+def make_course(instructor, category, index, lessons=3, **extra):
+    course = Course.objects.create(
+        title=f"Cours {index}",
+        description="Description du cours",
+        instructor=instructor,
+        category=category,
+        is_published=True,
+        **extra
+    )
+    for i in range(lessons):
+        Lesson.objects.create(course=course, title=f"Leçon {i}", content="Contenu", display_order=i)
+    return course
+
+
+class CourseQueryBudgetTests(TestCase):
+    # Le nombre de requêtes SQL ne doit pas dépendre de la taille du catalogue
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.category = Category.objects.create(name='Développement Web')
+
+    def add_courses(self, count, start=0):
+        return [make_course(self.instructor, self.category, start + i) for i in range(count)]
+
+    def test_list_query_count_is_constant(self):
+        self.add_courses(2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/courses/')
+        self.assertEqual(response.status_code, 200)
+
+        self.add_courses(10, start=2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/courses/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_query_count_is_constant(self):
+        course = make_course(self.instructor, self.category, 0, lessons=1)
+        big_course = make_course(self.instructor, self.category, 1, lessons=25)
+        for target in (course, big_course):
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/courses/{target.pk}/')
+            self.assertEqual(response.status_code, 200)
+
+    def test_lessons_are_returned_in_display_order(self):
+        course = Course.objects.create(
+            title='Ordre', description='-', instructor=self.instructor,
+            category=self.category, is_published=True,
+        )
+        Lesson.objects.create(course=course, title='B', display_order=2)
+        Lesson.objects.create(course=course, title='A', display_order=1)
+        response = self.client.get(f'/api/courses/{course.pk}/')
+        self.assertEqual([lesson['title'] for lesson in response.data['lessons']], ['A', 'B'])
+        self.assertEqual(response.data['instructor_name'], self.instructor.get_full_name())
+        self.assertEqual(response.data['category_name'], 'Développement Web')
+
+
+class CourseCatalogPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.category = Category.objects.create(name='Bureautique')
+        for i in range(5):
+            make_course(self.instructor, self.category, i, lessons=i)
+
+    def test_list_is_cursor_paginated_and_slim(self):
+        response = self.client.get('/api/courses/', {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        first = response.data['results'][0]
+        self.assertNotIn('lessons', first)
+        self.assertEqual(first['lessons_count'], 4)
+
+        seen = [c['id'] for c in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            seen += [c['id'] for c in response.data['results']]
+            next_url = response.data['next']
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_retrieve_keeps_full_serializer(self):
+        course = Course.objects.get(title='Cours 3')
+        response = self.client.get(f'/api/courses/{course.pk}/')
+        self.assertEqual(len(response.data['lessons']), 3)
+
+    def test_lessons_filtered_by_course_and_paginated(self):
+        user = User.objects.create_user('etudiant')
+        self.client.force_authenticate(user)
+        course = Course.objects.get(title='Cours 4')
+        response = self.client.get('/api/lessons/', {'course': course.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([l['display_order'] for l in response.data['results']], [0, 1, 2, 3])
+
+
+class CatalogCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.category = Category.objects.create(name='Marketing Digital')
+        self.course = make_course(self.instructor, self.category, 0)
+
+    def test_second_anonymous_hit_skips_database(self):
+        first = self.client.get('/api/courses/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/courses/')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_if_none_match_returns_304_without_queries(self):
+        etag = self.client.get('/api/categories/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_etag_depends_on_renderer_format(self):
+        etag = self.client.get('/api/categories/')['ETag']
+        response = self.client.get('/api/categories/', HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_catalog_changes_bump_version(self):
+        etag = self.client.get(f'/api/courses/{self.course.pk}/')['ETag']
+        self.course.title = 'Nouveau titre'
+        self.course.save()
+        response = self.client.get(f'/api/courses/{self.course.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Nouveau titre')
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        Lesson.objects.filter(course=self.course).first().delete()
+        response = self.client.get(f'/api/courses/{self.course.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(response.data['lessons']), 2)
+
+    def test_counter_changes_bump_version_at_most_once_per_interval(self):
+        url = f'/api/courses/{self.course.pk}/'
+        etag = self.client.get(url)['ETag']
+        student, other = User.objects.create_user('etudiant'), User.objects.create_user('autre')
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(user=student, course=self.course)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['enrollments_count'], 1)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(user=other, course=self.course)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Intervalle écoulé : la modification en attente est reprise à la lecture suivante
+        cache.delete(COUNTERS_THROTTLE_KEY)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['enrollments_count'], 2)
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.instructor)
+        response = self.client.get('/api/courses/')
+        self.assertNotIn('ETag', response)
+
+
+class LoadGeneratorTests(TestCase):
+
+    def test_generates_requested_volumes_deterministically(self):
+        generator = LoadGenerator(seed=7, batch_size=40)
+        generator.run(users=30, categories=3, courses=10, lessons=25, enrollments=120, payments=130)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Course.objects.count(), 10)
+        self.assertEqual(Lesson.objects.count(), 25)
+        self.assertEqual(Enrollment.objects.count(), 120)
+        self.assertEqual(Payment.objects.filter(status='failed').count(), 10)
+        self.assertTrue(generator.exists())
+
+        titles = list(Course.objects.order_by('id').values_list('title', 'level', 'price'))
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        LoadGenerator(seed=7, batch_size=40).run(
+            users=30, categories=3, courses=10, lessons=25, enrollments=120, payments=130,
+        )
+        self.assertEqual(list(Course.objects.order_by('id').values_list('title', 'level', 'price')), titles)
+
+
+class ApiBenchmarkBaselineTests(TestCase):
+    # Garde-fou rapide : le nombre de requêtes SQL par scénario ne doit pas dépasser la référence
+
+    def test_scenarios_stay_within_baseline_query_counts(self):
+        baseline = json.loads((settings.BASE_DIR / 'benchmarks' / 'api_baseline.json').read_text())
+        LoadGenerator(seed=1).run(users=20, courses=5, lessons=20, enrollments=30, payments=30)
+        ctx = build_context()
+        for scenario in SCENARIOS:
+            result = run_scenario(scenario, ctx, iterations=2, alloc_iterations=1)
+            with self.subTest(scenario=scenario.name):
+                self.assertLessEqual(result['queries'], baseline[scenario.name]['queries'])
+                self.assertEqual(result['statuses'], baseline[scenario.name]['statuses'])
+
+    def test_latency_drift_is_reported_separately(self):
+        reference = {'queries': 2, 'statuses': [200], 'p95_ms': 11.11, 'alloc_peak_kb': 100}
+        current = {**reference, 'p95_ms': 30.0}
+        self.assertEqual(compare({'detail': current}, {'detail': reference}),
+                         ([], ['detail: p95 30.00 ms > 16.66 ms']))
+        regressions, _ = compare({'detail': {**current, 'queries': 3, 'statuses': [500]}}, {'detail': reference})
+        self.assertEqual(len(regressions), 2)
+
+
+class CourseSearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        web = Category.objects.create(name='Développement Web')
+        office = Category.objects.create(name='Bureautique')
+        self.python = Course.objects.create(
+            title='Maîtriser Python', description='Le langage le plus populaire.',
+            instructor=instructor, category=web, is_published=True,
+        )
+        self.excel = Course.objects.create(
+            title='Excel avancé', description='Tableaux croisés dynamiques.',
+            instructor=instructor, category=office, is_published=True,
+        )
+        Lesson.objects.create(course=self.excel, title='Les formules élémentaires')
+        Course.objects.create(
+            title='Python brouillon', description='Non publié', instructor=instructor, is_published=False,
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/courses/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [course['id'] for course in response.data]
+
+    def test_accent_insensitive_matching_on_all_fields(self):
+        self.assertEqual(self.search('developpement'), [self.python.pk])
+        self.assertEqual(self.search('MAITRISER'), [self.python.pk])
+        self.assertEqual(self.search('elementaires'), [self.excel.pk])
+        self.assertEqual(self.search('croisés dynam'), [self.excel.pk])
+        self.assertEqual(self.search(''), [])
+
+    def test_index_follows_changes(self):
+        lesson = Lesson.objects.create(course=self.python, title='Introduction à Django')
+        self.assertEqual(self.search('django'), [self.python.pk])
+        lesson.delete()
+        self.assertEqual(self.search('django'), [])
+
+        category = self.excel.category
+        category.name = 'Informatique de gestion'
+        category.save()
+        self.assertEqual(self.search('gestion'), [self.excel.pk])
+
+    def test_returns_every_matching_course(self):
+        Course.objects.create(
+            title='Bases de données', description='Un peu de python ici, python là, python partout.',
+            instructor=self.python.instructor, is_published=True,
+        )
+        self.assertEqual(len(self.search('python')), 2)
+
+    def test_search_document_is_not_exposed(self):
+        for url in (f'/api/courses/{self.excel.pk}/', f'/api/async/courses/{self.excel.pk}/'):
+            data = self.client.get(url).json()
+            self.assertEqual(data['title'], 'Excel avancé')
+            self.assertNotIn('search_document', data)
+
+
+class LessonProgressBatchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        self.student = User.objects.create_user('etudiant')
+        self.course = make_course(instructor, None, 0, lessons=4)
+        self.other = make_course(instructor, None, 1, lessons=2)
+        self.enrollment = Enrollment.objects.create(user=self.student, course=self.course)
+        self.lessons = list(self.course.lessons.order_by('display_order'))
+        self.client.force_authenticate(self.student)
+
+    def post(self, events):
+        return self.client.post('/api/progress/batch/', {'events': events}, format='json')
+
+    def test_batch_is_coalesced_and_updates_enrollment(self):
+        first, second = self.lessons[:2]
+        foreign = self.other.lessons.first()
+        response = self.post([
+            {'lesson': first.pk, 'position': 30},
+            {'lesson': first.pk, 'position': 95, 'completed': True},
+            {'lesson': first.pk, 'position': 12},
+            {'lesson': second.pk, 'position': 40},
+            {'lesson': foreign.pk, 'completed': True},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual(response.data['rejected'], [foreign.pk])
+
+        progress = LessonProgress.objects.get(user=self.student, lesson=first)
+        self.assertEqual((progress.position, progress.completed), (12, True))
+        self.enrollment.refresh_from_db()
+        self.assertEqual((self.enrollment.completed_lessons, self.enrollment.progress), (1, 25))
+
+    def test_replayed_completions_are_not_counted_twice(self):
+        events = [{'lesson': lesson.pk, 'completed': True} for lesson in self.lessons[:3]]
+        self.post(events)
+        self.post(events + [{'lesson': self.lessons[3].pk, 'completed': True}])
+        self.post([{'lesson': self.lessons[0].pk, 'position': 5}])
+        self.enrollment.refresh_from_db()
+        self.assertEqual((self.enrollment.completed_lessons, self.enrollment.progress), (4, 100))
+        self.assertTrue(LessonProgress.objects.get(lesson=self.lessons[0]).completed)
+
+    def test_completion_without_position_keeps_playback_position(self):
+        first, second = self.lessons[:2]
+        self.post([{'lesson': first.pk, 'position': 340}])
+        self.post([{'lesson': first.pk, 'completed': True}, {'lesson': second.pk, 'completed': True}])
+        progress = LessonProgress.objects.get(user=self.student, lesson=first)
+        self.assertEqual((progress.position, progress.completed), (340, True))
+        self.assertEqual(LessonProgress.objects.get(user=self.student, lesson=second).position, 0)
+
+    def test_lesson_changes_recompute_progress(self):
+        self.post([{'lesson': lesson.pk, 'completed': True} for lesson in self.lessons[:2]])
+        Lesson.objects.create(course=self.course, title='Bonus', content='Contenu', display_order=4)
+        self.enrollment.refresh_from_db()
+        self.assertEqual((self.enrollment.completed_lessons, self.enrollment.progress), (2, 40))
+
+        self.lessons[0].delete()
+        self.lessons[3].delete()
+        self.enrollment.refresh_from_db()
+        self.assertEqual((self.enrollment.completed_lessons, self.enrollment.progress), (1, 33))
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.lessons_count, self.course.progress_total), (3, 33))
+        self.assertEqual(reconcile_course_stats(dry_run=True), 0)
+
+    def test_batch_query_count_does_not_grow_with_events(self):
+        events = [{'lesson': lesson.pk, 'completed': True} for lesson in self.lessons]
+        # + 1 UPDATE groupé des compteurs de progression des cours
+        with self.assertNumQueries(9):
+            self.post(events)
+
+    def test_list_returns_only_own_progress(self):
+        self.post([{'lesson': self.lessons[0].pk, 'position': 10}])
+        other = User.objects.create_user('autre')
+        Enrollment.objects.create(user=other, course=self.course)
+        LessonProgress.objects.create(user=other, lesson=self.lessons[1])
+        response = self.client.get('/api/progress/', {'lesson__course': self.course.pk})
+        self.assertEqual([p['lesson'] for p in response.data['results']], [self.lessons[0].pk])
+
+    def test_empty_batch_is_rejected(self):
+        self.assertEqual(self.post([]).status_code, 400)
+
+
+class PaymentPipelineTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        self.student = User.objects.create_user('etudiant')
+        self.course = make_course(instructor, None, 0, lessons=1, price=15000)
+        self.client.force_authenticate(self.student)
+
+    def buy(self, course):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/payments/', {'course': course.pk}, format='json')
+
+    def webhook(self, payload, signature=None):
+        body = json.dumps(payload).encode()
+        return APIClient().post(
+            '/api/payments/webhook/', body, content_type='application/json',
+            HTTP_X_PAYMENT_SIGNATURE=signature or sign_payload(body),
+        )
+
+    def test_purchase_is_confirmed_in_background(self):
+        response = self.buy(self.course)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        payment = Payment.objects.get(pk=response.data['id'])
+        self.assertEqual(payment.status, 'completed')
+        self.assertTrue(Enrollment.objects.filter(user=self.student, course=self.course).exists())
+        self.assertEqual(self.buy(self.course).status_code, 400)
+
+    @override_settings(PAYMENT_PROVIDER='core.payments.DeferredLocalProvider')
+    def test_webhook_is_idempotent(self):
+        transaction_id = self.buy(self.course).data['transaction_id']
+        self.assertFalse(Enrollment.objects.exists())
+
+        payload = {'transaction_id': transaction_id, 'status': 'completed'}
+        self.assertEqual(self.webhook(payload).data['status'], 'completed')
+        self.assertEqual(self.webhook(payload).data['status'], 'completed')
+        late_failure = self.webhook({'transaction_id': transaction_id, 'status': 'failed'})
+        self.assertEqual(late_failure.data['status'], 'completed')
+        self.assertEqual(Enrollment.objects.filter(user=self.student).count(), 1)
+
+    @override_settings(PAYMENT_PROVIDER='core.payments.DeferredLocalProvider')
+    def test_webhook_rejects_bad_signature_and_unknown_transactions(self):
+        transaction_id = self.buy(self.course).data['transaction_id']
+        payload = {'transaction_id': transaction_id, 'status': 'completed'}
+        self.assertEqual(self.webhook(payload, signature='bad').status_code, 403)
+        self.assertEqual(self.webhook({'transaction_id': 'TS-x', 'status': 'failed'}).status_code, 404)
+        self.assertEqual(Payment.objects.get(transaction_id=transaction_id).status, 'pending')
+
+    @override_settings(PAYMENT_PROVIDER='core.payments.DeferredLocalProvider')
+    def test_repeated_purchase_reuses_pending_payment(self):
+        first, second = self.buy(self.course), self.buy(self.course)
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(second.data['transaction_id'], first.data['transaction_id'])
+        self.assertEqual(Payment.objects.filter(user=self.student).count(), 1)
+
+        self.webhook({'transaction_id': first.data['transaction_id'], 'status': 'completed'})
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.revenue, 15000)
+
+    @override_settings(PAYMENT_PROVIDER='core.payments.DeferredLocalProvider')
+    def test_payment_completed_after_enrollment_adds_no_revenue(self):
+        transaction_id = self.buy(self.course).data['transaction_id']
+        Enrollment.objects.create(user=self.student, course=self.course)
+        self.webhook({'transaction_id': transaction_id, 'status': 'completed'})
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.revenue, 0)
+        self.assertEqual(self.course.enrollments_count, 1)
+
+    def test_free_course_enrolls_without_provider(self):
+        free = make_course(self.course.instructor, None, 1, lessons=0)
+        response = self.client.post('/api/payments/', {'course': free.pk}, format='json')
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertTrue(Enrollment.objects.filter(user=self.student, course=free).exists())
+
+
+class CachedAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('amina', password='motdepasse-solide')
+        response = self.client.post(
+            '/api/token/', {'username': 'amina', 'password': 'motdepasse-solide'}, format='json',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_me_is_served_from_cached_user(self):
+        self.assertEqual(self.client.get('/api/users/me/').data['username'], 'amina')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['id'], self.user.pk)
+
+    def test_profile_changes_invalidate_cache(self):
+        self.client.get('/api/users/me/')
+        self.user.bio = 'Développeuse à NDjamena'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+            # Évincé seulement après validation de la transaction
+            self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(self.client.get('/api/users/me/').data['bio'], 'Développeuse à NDjamena')
+
+    def test_password_change_revokes_existing_tokens(self):
+        self.client.get('/api/users/me/')
+        self.user.set_password('nouveau-secret-2026')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_tokens_without_version_are_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.get('/api/users/me/')
+        cached = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn('password', cached)
+        self.assertNotIn(self.user.password, repr(cached))
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/users/me/')
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+
+class UserListScopeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user('etudiant')
+        self.admin = User.objects.create_user('gestion', is_staff=True, user_type='admin')
+        for i in range(5):
+            User.objects.create_user(f'prof{i}', user_type='instructor')
+
+    def test_regular_user_only_sees_self(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/api/users/')
+        self.assertEqual([u['username'] for u in response.data['results']], ['etudiant'])
+        other = User.objects.get(username='prof0')
+        self.assertEqual(self.client.get(f'/api/users/{other.pk}/').status_code, 404)
+
+    def test_admin_lists_with_filters_and_keyset_pages(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/users/', {'user_type': 'instructor', 'page_size': 2})
+        usernames = [u['username'] for u in response.data['results']]
+        while response.data['next']:
+            with self.assertNumQueries(1):
+                response = self.client.get(response.data['next'])
+            usernames += [u['username'] for u in response.data['results']]
+        self.assertEqual(usernames, [f'prof{i}' for i in range(5)])
+
+
+class CategoryTreeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.tech = Category.objects.create(name='Informatique', display_order=1)
+        self.web = Category.objects.create(name='Web', parent=self.tech)
+        self.python = Category.objects.create(name='Python', parent=self.web)
+        self.business = Category.objects.create(name='Business', display_order=2)
+        make_course(self.instructor, self.web, 0, lessons=0)
+        make_course(self.instructor, self.python, 1, lessons=0)
+        Course.objects.create(title='Brouillon', description='-', instructor=self.instructor, category=self.python)
+
+    def test_paths_follow_moves(self):
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.depth, 2)
+        self.assertEqual(self.python.path, f"{self.web.path}{self.python.pk:010d}/")
+        self.assertTrue(self.web.path.startswith(self.tech.path))
+
+        self.web.parent = self.business
+        self.web.save()
+        self.python.refresh_from_db()
+        self.assertTrue(self.python.path.startswith(self.business.path))
+        self.assertEqual(self.python.depth, 2)
+
+        business_path = Category.objects.get(pk=self.business.pk).path
+        self.business.parent = self.python
+        with self.assertRaises(ValidationError) as raised:
+            self.business.full_clean()
+        self.assertIn('parent', raised.exception.message_dict)
+        with self.assertRaises(ValueError):
+            self.business.save()
+        business = Category.objects.get(pk=self.business.pk)
+        self.assertIsNone(business.parent_id)
+        self.assertEqual(business.path, business_path)
+        python = Category.objects.get(pk=self.python.pk)
+        self.assertEqual(python.parent_id, self.web.pk)
+        self.assertTrue(python.path.startswith(business_path))
+
+    def test_tree_endpoint_counts_published_courses_per_subtree(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/categories/tree/')
+        tech, business = response.data
+        self.assertEqual((tech['name'], tech['total_published_courses']), ('Informatique', 2))
+        web = tech['children'][0]
+        self.assertEqual((web['published_courses'], web['total_published_courses']), (1, 2))
+        self.assertEqual(web['children'][0]['published_courses'], 1)
+        self.assertEqual(business['children'], [])
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/categories/tree/')
+        make_course(self.instructor, self.business, 3, lessons=0)
+        response = self.client.get('/api/categories/tree/')
+        self.assertEqual(response.data[1]['total_published_courses'], 1)
+
+
+def make_image(name='photo.jpg', size=(1600, 900)):
+    image = Image.new('RGB', size, (200, 120, 40))
+    exif = Image.Exif()
+    exif[0x010F] = 'Appareil'  # Make
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageVariantTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+
+    def test_thumbnail_variants_are_generated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            course = Course.objects.create(
+                title='Photo', description='-', instructor=self.instructor, is_published=True,
+                thumbnail=make_image(),
+            )
+        course.refresh_from_db()
+        variants = course.thumbnail_variants
+        self.assertEqual(variants['source'], course.thumbnail.name)
+        self.assertEqual([s['width'] for s in variants['formats']['webp']['sources']], [320, 640, 1280])
+        self.assertIn('640w', variants['formats']['jpeg']['srcset'])
+
+        name = variants['formats']['jpeg']['sources'][0]['name']
+        with course.thumbnail.storage.open(name) as stored:
+            self.assertFalse(Image.open(stored).getexif())
+
+        response = self.client.get(f'/api/courses/{course.pk}/')
+        self.assertEqual(response.data['thumbnail_variants']['formats']['webp']['type'], 'image/webp')
+
+    def test_small_avatar_is_not_upscaled_and_removal_clears_variants(self):
+        user = User.objects.create_user('amina')
+        with self.captureOnCommitCallbacks(execute=True):
+            user.avatar = make_image('avatar.jpg', size=(200, 200))
+            user.save()
+        user.refresh_from_db()
+        sources = user.avatar_variants['formats']['webp']['sources']
+        self.assertEqual([s['width'] for s in sources], [200])
+        storage = user.avatar.storage
+        self.assertTrue(storage.exists(sources[0]['name']))
+
+        # Variantes régénérées par .update() : l'utilisateur mis en cache est évincé
+        User.objects.filter(pk=user.pk).update(avatar_variants={})
+        cache.set(user_cache_key(user.pk), {'avatar_variants': {}})
+        process_image_variants('core.User', user.pk)
+        self.assertIsNone(cache.get(user_cache_key(user.pk)))
+        user.refresh_from_db()
+        sources = user.avatar_variants['formats']['webp']['sources']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.avatar = None
+            user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.avatar_variants, {})
+        self.assertFalse(storage.exists(sources[0]['name']))
+
+
+class AsyncCatalogTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        instructor = User.objects.create_user('prof', first_name='Ahmed', user_type='instructor')
+        self.category = Category.objects.create(name='Entrepreneuriat')
+        self.courses = [make_course(instructor, self.category, i, lessons=2) for i in range(3)]
+
+    async def test_async_endpoints_match_sync_responses(self):
+        sync_list = await sync_to_async(lambda: APIClient().get('/api/courses/').json())()
+        response = await self.async_client.get('/api/async/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], sync_list['results'])
+
+        pk = self.courses[0].pk
+        sync_detail = await sync_to_async(lambda: APIClient().get(f'/api/courses/{pk}/').json())()
+        response = await self.async_client.get(f'/api/async/courses/{pk}/')
+        self.assertEqual(response.json(), sync_detail)
+
+        response = await self.async_client.get('/api/async/categories/')
+        self.assertEqual([c['name'] for c in response.json()], ['Entrepreneuriat'])
+        self.assertEqual((await self.async_client.get('/api/async/courses/0/')).status_code, 404)
+
+    async def test_async_etag_and_pagination(self):
+        first = await self.async_client.get('/api/async/courses/', {'page_size': 2})
+        data = first.json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIn('/api/async/courses/', data['next'])
+        revalidated = await self.async_client.get(
+            '/api/async/courses/', {'page_size': 2}, headers={'If-None-Match': first['ETag']},
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        category = Category.objects.create(name='Informatique')
+        self.course = make_course(instructor, category, 0)
+
+    def test_server_timing_and_metrics(self):
+        response = self.client.get('/api/courses/')
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'render', 'app', 'total'})
+        self.assertIn('desc="1 queries"', timing['db'])
+
+        self.client.get(f'/api/courses/{self.course.pk}/')
+        with override_settings(DEBUG=True):
+            body = self.client.get('/metrics').content.decode()
+        self.assertIn('tchadskills_requests_total{view="CourseViewSet.list",status="200"} 1', body)
+        self.assertIn('tchadskills_db_queries_count{view="CourseViewSet.retrieve"} 1', body)
+        self.assertIn('tchadskills_response_size_bytes_bucket{view="CourseViewSet.list",le="+Inf"} 1', body)
+
+    def test_metrics_token(self):
+        # Production sans jeton configuré : fermé
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer autre').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PERF_N_PLUS_ONE_THRESHOLD=3, PERF_SLOW_QUERY_MS=0, PERF_SLOW_REQUEST_MS=0)
+    def test_slow_and_n_plus_one_warnings(self):
+        def view(request):
+            for lesson in Lesson.objects.all():
+                lesson.course.title
+            return HttpResponse('ok')
+
+        with self.assertLogs('core.performance', level='WARNING') as logs:
+            PerformanceMiddleware(view)(RequestFactory().get('/'))
+        output = '\n'.join(logs.output)
+        self.assertIn('Requête lente', output)
+        self.assertIn('Requête SQL lente', output)
+        self.assertIn('N+1 probable', output)
+
+
+class CourseStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.student = User.objects.create_user('etudiant')
+        self.course = make_course(self.instructor, None, 0, lessons=4, price=10000)
+
+    def stats(self):
+        self.course.refresh_from_db()
+        return (self.course.lessons_count, self.course.enrollments_count,
+                self.course.revenue, self.course.average_progress)
+
+    def test_counters_follow_lessons_payments_and_progress(self):
+        self.assertEqual(self.stats(), (4, 0, 0, 0))
+        stale = Course.objects.get(pk=self.course.pk)
+        self.client.force_authenticate(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/payments/', {'course': self.course.pk}, format='json')
+        self.assertEqual(self.stats(), (4, 1, 10000, 0))
+
+        lessons = list(self.course.lessons.all())
+        self.client.post('/api/progress/batch/', {'events': [
+            {'lesson': lessons[0].pk, 'completed': True}, {'lesson': lessons[1].pk, 'completed': True},
+        ]}, format='json')
+        self.assertEqual(self.stats(), (4, 1, 10000, 50))
+        Course.objects.filter(pk=self.course.pk).update(
+            thumbnail_variants={'source': 'x.jpg'}, search_document='document indexe',
+        )
+        stale.title = 'Titre modifié'
+        stale.save()
+        self.assertEqual(self.stats(), (4, 1, 10000, 50))
+        self.assertEqual(self.course.thumbnail_variants, {'source': 'x.jpg'})
+        # Réindexé par le signal (bulk_update), pas par le save() de l'instance périmée
+        self.assertTrue(self.course.search_document.startswith('titre modifie'))
+
+        lessons[3].delete()
+        Enrollment.objects.get(user=self.student).delete()
+        self.assertEqual(self.stats(), (3, 0, 10000, 0))
+
+    def test_reconcile_fixes_drift_in_bulk(self):
+        Enrollment.objects.create(user=self.student, course=self.course, progress=40)
+        Payment.objects.create(user=self.student, course=self.course, amount=10000,
+                               transaction_id='TS-1', status='completed')
+        Course.objects.update(lessons_count=0, enrollments_count=7, revenue=0, progress_total=0)
+        self.assertEqual(reconcile_course_stats(dry_run=True), 1)
+        with self.assertNumQueries(2):
+            self.assertEqual(reconcile_course_stats(), 1)
+        self.assertEqual(self.stats(), (4, 1, 10000, 40))
+        self.assertEqual(reconcile_course_stats(), 0)
+
+    def test_serializers_expose_counters_without_queries(self):
+        data = self.client.get('/api/courses/').json()['results'][0]
+        self.assertEqual((data['lessons_count'], data['enrollments_count'], data['average_progress']), (4, 0, 0))
+        data = self.client.get(f'/api/courses/{self.course.pk}/').json()
+        self.assertNotIn('revenue', data)
+        self.assertNotIn('progress_total', data)
+        self.client.force_authenticate(self.instructor)
+        self.assertEqual(self.client.get(f'/api/courses/{self.course.pk}/').json()['revenue'], '0.00')
+
+
+class InstructorDashboardTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.course = make_course(self.instructor, None, 0, lessons=2, price=5000)
+        self.other = make_course(User.objects.create_user('prof2', user_type='instructor'), None, 1, lessons=1)
+        self.today = timezone.localdate()
+
+    def enroll(self, username, days_ago, progress=0, paid=True):
+        student = User.objects.create_user(username)
+        moment = timezone.now() - timedelta(days=days_ago)
+        enrollment = Enrollment.objects.create(user=student, course=self.course, progress=progress)
+        Enrollment.objects.filter(pk=enrollment.pk).update(enrolled_at=moment)
+        if paid:
+            payment = Payment.objects.create(user=student, course=self.course, amount=5000,
+                                             transaction_id=f'TS-{username}', status='completed')
+            Payment.objects.filter(pk=payment.pk).update(created_at=moment)
+
+    def test_rollup_is_incremental(self):
+        self.enroll('a', 5, progress=100)
+        self.enroll('b', 3, progress=30)
+        self.enroll('c', 3, paid=False)
+        self.assertEqual(rollup_daily_stats(), 3)
+        rows = {row.day: row for row in CourseDailyStats.objects.filter(course=self.course)}
+        day = self.today - timedelta(days=3)
+        self.assertEqual((rows[day].enrollments, rows[day].payments, rows[day].revenue), (2, 1, 5000))
+        yesterday = rows[self.today - timedelta(days=1)]
+        self.assertEqual(yesterday.progress_distribution, [1, 0, 1, 0, 0, 1])
+        self.assertEqual(rows[day].progress_distribution, [])
+
+        # Jours déjà agrégés hors de la marge de recalcul : non relus
+        self.enroll('d', 5)
+        self.enroll('e', 0)
+        rollup_daily_stats()
+        old = CourseDailyStats.objects.get(course=self.course, day=self.today - timedelta(days=5))
+        self.assertEqual(old.enrollments, 1)
+        self.assertFalse(CourseDailyStats.objects.filter(day=self.today).exists())
+
+    def test_progress_snapshot_only_rereads_changed_courses(self):
+        self.enroll('a', 5, progress=100)
+        other = Enrollment.objects.create(user=User.objects.create_user('b'), course=self.other, progress=10)
+        rollup_daily_stats(until=self.today - timedelta(days=2))
+        # Inscriptions non modifiées depuis : la répartition du cours est reprise, pas relue
+        Enrollment.objects.filter(pk=other.pk).update(progress=60, updated_at=timezone.now() - timedelta(days=3))
+        Enrollment.objects.filter(course=self.course).update(progress=30)
+        self.enroll('c', 4, paid=False)
+        rollup_daily_stats()
+        snapshot = dict(CourseDailyStats.objects.filter(day=self.today - timedelta(days=1))
+                        .values_list('course_id', 'progress_distribution'))
+        self.assertEqual(snapshot, {self.course.pk: [1, 0, 1, 0, 0, 0], self.other.pk: [0, 1, 0, 0, 0, 0]})
+
+        # Suppression sans trace (cascade d'un utilisateur) : détectée par le compteur d'inscriptions
+        User.objects.filter(username='b').delete()
+        rollup_daily_stats(until=self.today)
+        self.assertEqual(
+            CourseDailyStats.objects.filter(day=self.today, course=self.other).values_list(
+                'progress_distribution', flat=True).first(), None,
+        )
+
+    def test_instructor_api_reads_rollups(self):
+        self.enroll('a', 2, progress=50)
+        self.enroll('b', 1)
+        rollup_daily_stats()
+        self.client.force_authenticate(self.instructor)
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/instructor/stats/', {'days': 7}).json()
+        self.assertEqual([(row['enrollments'], row['revenue']) for row in data['series']],
+                         [(1, '5000.00'), (1, '5000.00')])
+        self.assertEqual(len(data['courses']), 1)
+        self.assertEqual(data['courses'][0]['revenue'], '10000.00')
+        self.assertEqual(data['courses'][0]['progress_distribution'], [1, 0, 0, 1, 0, 0])
+
+        detail = self.client.get(f'/api/instructor/stats/{self.course.pk}/').json()
+        self.assertEqual(len(detail['series']), 2)
+        self.assertEqual(self.client.get(f'/api/instructor/stats/{self.other.pk}/').status_code, 404)
+
+        self.client.force_authenticate(User.objects.create_user('etudiant'))
+        self.assertEqual(self.client.get('/api/instructor/stats/').status_code, 403)
+
+
+class StreamingExportTests(TestCase):
+
+    def setUp(self):
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        self.course = make_course(instructor, None, 0, lessons=0, price=2500)
+        self.other = make_course(instructor, None, 1, lessons=0)
+        for i in range(5):
+            student = User.objects.create_user(f'etudiant{i}', email=f'e{i}@exemple.td')
+            Enrollment.objects.create(user=student, course=self.other if i == 4 else self.course)
+            Payment.objects.create(user=student, course=self.course, amount=2500,
+                                   transaction_id=f'TS-{i}', status='completed')
+        old = timezone.now() - timedelta(days=10)
+        Payment.objects.filter(transaction_id='TS-0').update(created_at=old)
+
+    def test_csv_stream_with_filters(self):
+        today = timezone.localdate()
+        with self.assertNumQueries(1):
+            lines = list(stream_export('payments', 'csv', since=today - timedelta(days=1), until=today))
+        rows = list(csv.reader(''.join(lines).splitlines()))
+        self.assertEqual(rows[0][:4], ['id', 'created_at', 'transaction_id', 'status'])
+        self.assertEqual([row[2] for row in rows[1:]], ['TS-1', 'TS-2', 'TS-3', 'TS-4'])
+
+        lines = list(stream_export('enrollments', 'jsonl', course_ids=[self.other.pk]))
+        self.assertEqual([json.loads(line)['user__username'] for line in lines], ['etudiant4'])
+
+    def test_admin_action_streams_selection(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@exemple.td', 'secret')
+        self.client.force_login(admin_user)
+        selected = Payment.objects.filter(transaction_id__in=['TS-1', 'TS-3'])
+        response = self.client.post('/admin/core/payment/', {
+            'action': 'export_jsonl', '_selected_action': [p.pk for p in selected],
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="payments-', response['Content-Disposition'])
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([r['transaction_id'] for r in records], ['TS-1', 'TS-3'])
+        self.assertEqual(records[0]['amount'], '2500.00')
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_filters_by_course_and_date_range(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@exemple.td', 'secret'))
+        today = timezone.localdate()
+        params = {'created_at__since': (today - timedelta(days=1)).isoformat(),
+                  'created_at__until': today.isoformat(), 'course__id__exact': self.course.pk}
+        response = self.client.get('/admin/core/payment/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(p.transaction_id for p in response.context['cl'].result_list),
+                         ['TS-1', 'TS-2', 'TS-3', 'TS-4'])
+        self.assertContains(response, 'name="created_at__until"')
+
+        # Export de tous les résultats filtrés (« sélectionner tout »)
+        until = (today - timedelta(days=5)).isoformat()
+        response = self.client.post(f'/admin/core/payment/?created_at__until={until}', {
+            'action': 'export_jsonl', 'select_across': '1', 'index': '0',
+            '_selected_action': [Payment.objects.first().pk],
+        })
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([r['transaction_id'] for r in records], ['TS-0'])
+
+        response = self.client.get('/admin/core/enrollment/', {'course__id__exact': self.other.pk})
+        self.assertEqual([e.user.username for e in response.context['cl'].result_list], ['etudiant4'])
+        self.assertEqual(self.client.get('/admin/core/enrollment/', {'enrolled_at__since': 'hier'}).status_code, 302)
+
+    def test_export_command_writes_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'inscriptions.csv')
+        call_command('export_records', 'enrollments', '--course', str(self.course.pk), '-o', path,
+                     '--chunk-size', '2', stderr=StringIO())
+        with open(path, encoding='utf-8') as export:
+            self.assertEqual(len(export.read().splitlines()), 5)
+
+
+class CourseImportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.category = Category.objects.create(name='Bureautique')
+        make_course(self.instructor, None, 0, lessons=0, slug='excel-avance')
+        self.client.force_authenticate(self.instructor)
+
+    def post(self, data, **kwargs):
+        return self.client.post('/api/courses/import/', data, format='json', **kwargs)
+
+    def test_batch_is_written_in_constant_queries(self):
+        courses = [
+            {'title': 'Excel avancé', 'description': 'Tableaux croisés', 'category': self.category.pk,
+             'is_published': True, 'lessons': [{'title': f'Leçon {i}'} for i in range(20)]}
+            for _ in range(3)
+        ]
+        with self.assertNumQueries(12):
+            response = self.post({'courses': courses})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([c['slug'] for c in response.data['courses']],
+                         ['excel-avance-2', 'excel-avance-3', 'excel-avance-4'])
+        course = Course.objects.get(slug='excel-avance-3')
+        self.assertEqual((course.lessons_count, course.lessons.count()), (20, 20))
+        self.assertEqual(list(course.lessons.values_list('display_order', flat=True))[:3], [0, 1, 2])
+        self.assertEqual(self.client.get('/api/courses/search/', {'q': 'croises'}).data[0]['slug'][:12],
+                         'excel-avance')
+
+    def test_invalid_batch_writes_nothing(self):
+        response = self.post([
+            {'title': 'Word', 'description': 'Bases', 'lessons': [{'title': 'Intro'}]},
+            {'title': 'PowerPoint', 'description': 'Bases', 'category': 999, 'level': 'expert'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['courses'][0], {})
+        self.assertEqual(set(response.data['courses'][1]), {'level'})
+        response = self.post({'title': 'PowerPoint', 'description': 'Bases', 'category': 999})
+        self.assertIn('category', response.data['courses'][0])
+        response = self.post({'title': 'Word', 'description': 'Bases', 'instructor': self.instructor.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Course.objects.count(), 1)
+
+        self.client.force_authenticate(User.objects.create_user('etudiant'))
+        self.assertEqual(self.post({'title': 'Word', 'description': 'Bases'}).status_code, 403)
+
+    def test_csv_upload_and_command(self):
+        rows = (
+            "title,description,category,lesson_title,lesson_order\n"
+            f"Excel avancé,Formules,{self.category.pk},Formules,2\n"
+            f"Excel avancé,Formules,{self.category.pk},Graphiques,1\n"
+            "Comptabilité,Bilan,,,\n"
+        )
+        upload = SimpleUploadedFile('cours.csv', rows.encode(), content_type='text/csv')
+        response = self.client.post('/api/courses/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([(c['slug'], c['lessons_count']) for c in response.data['courses']],
+                         [('excel-avance-2', 2), ('comptabilite', 0)])
+        titles = Course.objects.get(slug='excel-avance-2').lessons.values_list('title', flat=True)
+        self.assertEqual(list(titles), ['Graphiques', 'Formules'])
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'cours.json')
+        with open(path, 'w', encoding='utf-8') as export:
+            # La commande accepte un autre instructeur explicite, sans utilisateur fictif
+            other = User.objects.create_user('prof-invite', user_type='instructor')
+            json.dump({'courses': [{'title': 'Comptabilité', 'description': 'Bilan'},
+                                   {'title': 'Fiscalité', 'description': 'TVA', 'instructor': other.pk}]}, export)
+        call_command('import_courses', path, '--instructor', 'prof', stdout=StringIO())
+        self.assertTrue(Course.objects.filter(slug='comptabilite-2', instructor=self.instructor).exists())
+        self.assertTrue(Course.objects.filter(slug='fiscalite', instructor=other).exists())
+
+
+class DeltaSyncTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        self.student = User.objects.create_user('etudiant')
+        category = Category.objects.create(name='Informatique')
+        self.course = make_course(instructor, category, 0, lessons=3)
+        self.other = make_course(instructor, category, 1, lessons=2)
+        Enrollment.objects.create(user=self.student, course=self.course)
+        self.client.force_authenticate(self.student)
+
+    def sync(self, token=None, **extra):
+        return self.client.get('/api/sync/', {'since': token} if token else {}, **extra)
+
+    def age_everything(self):
+        past = timezone.now() - timedelta(hours=1)
+        for model in (Category, Course, Lesson):
+            model.objects.update(updated_at=past)
+        Enrollment.objects.update(updated_at=past, enrolled_at=past)
+        Tombstone.objects.update(deleted_at=past)
+
+    def test_full_then_incremental_sync(self):
+        self.age_everything()
+        data = self.sync().json()
+        self.assertTrue(data['full'])
+        self.assertEqual([c['id'] for c in data['courses']], [self.course.pk])
+        self.assertEqual(len(data['lessons']), 3)
+        self.assertEqual(len(data['enrollments']), 1)
+
+        delta = self.sync(data['token']).json()
+        self.assertFalse(delta['full'])
+        self.assertEqual((delta['courses'], delta['lessons'], delta['deleted']), ([], [], {}))
+
+        first, second = self.course.lessons.order_by('display_order')[:2]
+        first.title = 'Introduction (mise à jour)'
+        first.save()
+        deleted_pk = second.pk
+        second.delete()
+        Enrollment.objects.create(user=self.student, course=self.other)
+        with self.assertNumQueries(7):
+            delta = self.sync(data['token']).json()
+        self.assertEqual([c['id'] for c in delta['courses']], [self.other.pk])
+        self.assertEqual(sorted(lesson['title'] for lesson in delta['lessons']),
+                         ['Introduction (mise à jour)', 'Leçon 0', 'Leçon 1'])
+        self.assertEqual(delta['deleted'], {'lesson': [deleted_pk]})
+
+    def test_course_tombstones_only_reach_enrolled_clients(self):
+        enrollment = Enrollment.objects.get(user=self.student)
+        outsider = User.objects.create_user('visiteur')
+        self.age_everything()
+        token = self.sync().json()['token']
+        self.client.force_authenticate(outsider)
+        outsider_token = self.sync().json()['token']
+
+        self.other.delete()
+        self.course.instructor.delete()  # Cascade : tous ses cours
+        self.assertEqual(self.sync(outsider_token).json()['deleted'], {})
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.sync(token).json()['deleted'],
+                         {'course': [self.course.pk], 'enrollment': [enrollment.pk]})
+
+    def test_token_is_bound_to_user_and_response_is_compressed(self):
+        token = self.sync().json()['token']
+        self.client.force_authenticate(User.objects.create_user('autre'))
+        self.assertEqual(self.sync(token).status_code, 400)
+        self.assertEqual(self.sync('falsifié').status_code, 400)
+        response = self.sync(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_expired_token_forces_full_sync(self):
+        token = self.sync().json()['token']
+        pk = self.course.pk
+        self.course.delete()
+        self.assertTrue(Tombstone.objects.filter(model='course', object_id=pk).exists())
+        self.assertFalse(Tombstone.objects.filter(model='lesson').exists())
+        with override_settings(SYNC_TOMBSTONE_DAYS=0):
+            self.assertTrue(self.sync(token).json()['full'])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class FrontendShellTests(TestCase):
+
+    def setUp(self):
+        _rendered_shell.cache_clear()
+        self.addCleanup(_rendered_shell.cache_clear)
+
+    def test_shell_references_static_bundles(self):
+        response = self.client.get('/')
+        html = response.content.decode()
+        self.assertIn('/static/css/app.css', html)
+        self.assertIn('/static/js/app.js', html)
+        self.assertNotIn('<style>', html)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_repeat_visit_is_a_304(self):
+        etag = self.client.get('/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        compressed = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        revalidated = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    # Second alias SQLite sur la même base de test, ajouté après la mise en place de la classe
+    # (comme un réplica à jour) ; TransactionTestCase : les écritures sont validées et visibles
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        default = connections['default'].settings_dict
+        connections.settings['replica'] = {**default, 'TEST': {**default['TEST'], 'MIRROR': 'default'}}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user('prof', user_type='instructor')
+        self.course = make_course(self.instructor, None, 0, lessons=2)
+        cache.delete(CATALOG_PIN_KEY)
+
+    def queries(self, alias, method, url, data=None):
+        with CaptureQueriesContext(connections[alias]) as captured:
+            response = getattr(self.client, method)(url, data, format='json')
+        return response, len(captured)
+
+    def test_catalog_reads_go_to_replica_until_user_writes(self):
+        response, on_replica = self.queries('replica', 'get', '/api/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(on_replica, 0)
+        _, on_replica = self.queries('replica', 'get', f'/api/lessons/?course={self.course.pk}')
+        self.assertEqual(on_replica, 0)  # Anonyme : 401 avant toute lecture
+
+        self.client.force_authenticate(self.instructor)
+        _, on_replica = self.queries('replica', 'get', f'/api/courses/{self.course.pk}/')
+        self.assertGreater(on_replica, 0)
+        _, on_replica = self.queries('replica', 'get', '/api/payments/')
+        self.assertEqual(on_replica, 0)
+
+        response, on_replica = self.queries('replica', 'patch', f'/api/courses/{self.course.pk}/', {'title': 'Nouveau'})
+        self.assertEqual((response.status_code, on_replica), (200, 0))
+        response, on_replica = self.queries('replica', 'get', f'/api/courses/{self.course.pk}/')
+        self.assertEqual((response.data['title'], on_replica), ('Nouveau', 0))
+
+        # Catalogue modifié : les autres visiteurs remplissent le cache depuis le primaire
+        self.client.force_authenticate(User.objects.create_user('etudiant'))
+        response, on_replica = self.queries('replica', 'get', f'/api/courses/{self.course.pk}/')
+        self.assertEqual((response.data['title'], on_replica), ('Nouveau', 0))
+        self.client.force_authenticate(None)
+        _, on_replica = self.queries('replica', 'get', '/api/async/courses/')
+        self.assertEqual(on_replica, 0)
+
+        cache.delete(CATALOG_PIN_KEY)  # Délai DATABASE_REPLICA_PIN_SECONDS écoulé
+        self.client.force_authenticate(User.objects.create_user('etudiant2'))
+        _, on_replica = self.queries('replica', 'get', f'/api/courses/{self.course.pk}/')
+        self.assertGreater(on_replica, 0)
+
+
+class RecommendationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        self.web = Category.objects.create(name='Web')
+        self.office = Category.objects.create(name='Bureautique')
+        self.html, self.css, self.js = [make_course(instructor, self.web, i, lessons=0) for i in range(3)]
+        self.excel = make_course(instructor, self.office, 3, lessons=0)
+        self.word = make_course(instructor, self.office, 4, lessons=0, level='advanced')
+        self.cold = make_course(instructor, self.office, 5, lessons=0, level='advanced')
+        baskets = [
+            [self.html, self.css, self.js], [self.html, self.css], [self.html, self.css],
+            [self.html, self.js], [self.excel, self.word], [self.word],
+        ]
+        for index, basket in enumerate(baskets):
+            student = User.objects.create_user(f'etudiant{index}')
+            for course in basket:
+                Enrollment.objects.create(user=student, course=course)
+        self.newcomer = User.objects.create_user('nouveau')
+
+    def test_similarity_matrix_keeps_top_k_by_cosine(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            build_recommendations(top_k=2, batch_size=2)
+        neighbours = list(CourseSimilarity.objects.filter(course=self.html).order_by('rank'))
+        # html/css : 3 / sqrt(4 * 3) ; html/js : 2 / sqrt(4 * 2)
+        self.assertEqual([n.similar_id for n in neighbours], [self.css.pk, self.js.pk])
+        self.assertAlmostEqual(neighbours[0].score, 3 / (12 ** 0.5), places=5)
+        self.assertFalse(CourseSimilarity.objects.filter(course=self.cold).exists())
+        self.assertEqual(CourseSimilarity.objects.filter(course=self.excel).get().similar_id, self.word.pk)
+
+        build_recommendations(top_k=2, min_support=3)
+        self.assertEqual(list(CourseSimilarity.objects.values_list('course_id', 'similar_id')),
+                         [(self.html.pk, self.css.pk), (self.css.pk, self.html.pk)])
+
+    def test_related_endpoint_with_cold_start_fallback(self):
+        build_recommendations()
+        with self.assertNumQueries(2):
+            data = self.client.get(f'/api/courses/{self.js.pk}/related/').json()
+        self.assertEqual([c['id'] for c in data[:2]], [self.html.pk, self.css.pk])
+        # Cours sans co-inscription : même catégorie, même niveau d'abord, puis popularité
+        data = self.client.get(f'/api/courses/{self.cold.pk}/related/').json()
+        self.assertEqual([c['id'] for c in data], [self.word.pk, self.excel.pk])
+
+    def test_recommended_for_user(self):
+        build_recommendations()
+        student = User.objects.get(username='etudiant4')  # excel + word
+        Enrollment.objects.create(user=student, course=self.css)
+        self.client.force_authenticate(student)
+        data = self.client.get('/api/courses/recommended/').json()
+        self.assertEqual([c['id'] for c in data[:2]], [self.html.pk, self.js.pk])
+
+        # Sans inscription : cours les plus suivis
+        self.client.force_authenticate(self.newcomer)
+        data = self.client.get('/api/courses/recommended/').json()
+        self.assertEqual({c['id'] for c in data[:2]}, {self.html.pk, self.css.pk})
+        self.assertEqual(len(data), 6)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/courses/recommended/').status_code, 401)
+
+
+@override_settings(AUTH_THROTTLE_RATES={'login_ip': '5/min', 'login_username': '3/min', 'register_ip': '2/hour'})
+class AuthThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user('amina', password='motdepasse-solide')
+
+    def login(self, username, password='mauvais', ip='198.18.0.1'):
+        return self.client.post('/api/token/', {'username': username, 'password': password},
+                                format='json', REMOTE_ADDR=ip)
+
+    @patch('core.throttling.SlidingWindowThrottle.timer', return_value=1_000_000 * 60 + 10)
+    def test_username_limit_spans_ips_and_skips_hashing(self, timer):
+        # Horloge figée : pas de changement de fenêtre au milieu du test
+        for index in range(3):
+            self.assertEqual(self.login('amina', ip=f'198.18.0.{index}').status_code, 401)
+        # Rejet sans requête SQL, donc sans vérification du mot de passe
+        with self.assertNumQueries(0):
+            response = self.login('Amina', password='motdepasse-solide', ip='198.18.0.9')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '50')
+        self.assertEqual(self.login('moussa', ip='198.18.0.9').status_code, 401)
+
+    def test_ip_limit_and_sliding_window(self):
+        now = 1_000_000 * 60 + 30
+        with patch('core.throttling.SlidingWindowThrottle.timer', side_effect=lambda: now):
+            for index in range(5):
+                self.assertEqual(self.login(f'compte{index}').status_code, 401)
+            self.assertEqual(self.login('compte9').status_code, 429)
+            # 30 s dans la fenêtre suivante : 5 * 0.5 tentatives encore comptées, 3 de plus possibles
+            now += 60
+            for index in range(10, 13):
+                self.assertEqual(self.login(f'compte{index}').status_code, 401)
+            self.assertEqual(self.login('compte13').status_code, 429)
+
+    def test_registration_limit(self):
+        for index in range(2):
+            response = self.client.post('/api/users/', {'username': f'nouveau{index}', 'password': 'secret-2026'},
+                                        format='json', REMOTE_ADDR='198.18.0.5')
+            self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/users/', {'username': 'nouveau3', 'password': 'secret-2026'},
+                                    format='json', REMOTE_ADDR='198.18.0.5')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertFalse(User.objects.filter(username='nouveau3').exists())
+
+
+class PresignedStorage(FileSystemStorage):
+    # Substitut local de S3Boto3Storage (querystring_auth) : URLs expirantes
+    querystring_auth = True
+
+    def url(self, name):
+        return f"{super().url(name)}?X-Amz-Expires={settings.MEDIA_URL_MAX_AGE}"
+
+
+class LessonMediaTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(PRIVATE_MEDIA_ROOT=self.root, MEDIA_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        instructor = User.objects.create_user('prof', user_type='instructor')
+        course = Course.objects.create(title='Vidéo', description='-', instructor=instructor, is_published=True)
+        self.data = bytes(range(256)) * 4
+        self.lesson = Lesson.objects.create(
+            course=course, title='Intro', media_file=SimpleUploadedFile('intro.mp4', self.data),
+        )
+        self.student = User.objects.create_user('etudiant')
+        Enrollment.objects.create(user=self.student, course=course)
+
+    def signed_url(self, user=None):
+        self.client.force_authenticate(user or self.student)
+        response = self.client.get(f'/api/lessons/{self.lesson.pk}/media/')
+        self.client.force_authenticate(None)
+        return response
+
+    def test_signed_url_requires_enrollment(self):
+        self.assertEqual(self.signed_url(User.objects.create_user('curieux')).status_code, 403)
+        self.client.force_authenticate(self.student)
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/lessons/{self.lesson.pk}/media/')
+        self.assertEqual(response.data['expires_in'], settings.MEDIA_URL_MAX_AGE)
+        lesson = self.client.get(f'/api/lessons/{self.lesson.pk}/').data
+        self.assertTrue(lesson['has_media'])
+        self.assertNotIn('media_file', lesson)
+        # Aucune URL publique pour le stockage privé
+        with self.assertRaises(ValueError):
+            self.lesson.media_file.url
+
+    def test_range_requests(self):
+        url = self.signed_url().data['url']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:200])
+        response = self.client.get(url, HTTP_RANGE='bytes=-24')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-24:])
+        response = self.client.get(url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_expired_or_tampered_links_are_rejected(self):
+        url = self.signed_url().data['url']
+        self.assertEqual(self.client.get(url.replace('/media/', '/media/x')).status_code, 403)
+        with override_settings(MEDIA_URL_MAX_AGE=-1):
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_offloaded_delivery_modes(self):
+        with override_settings(MEDIA_DELIVERY='accel'):
+            response = self.client.get(self.signed_url().data['url'])
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.lesson.media_file.name}')
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+
+        # Stockage sans URLs présignées (disque local) : le lien reste signé et expirant
+        with override_settings(MEDIA_DELIVERY='storage',
+                               LESSON_MEDIA_STORAGE='django.core.files.storage.FileSystemStorage'):
+            url = self.signed_url().data['url']
+            self.assertTrue(url.startswith('http://testserver/api/media/'))
+            self.assertEqual(self.client.get(url).status_code, 200)
+            with override_settings(MEDIA_URL_MAX_AGE=-1):
+                self.assertEqual(self.client.get(url).status_code, 403)
+
+        # Stockage objet (S3) simulé par le disque local : URL présignée du stockage
+        with override_settings(MEDIA_DELIVERY='storage', LESSON_MEDIA_STORAGE='core.tests.PresignedStorage'):
+            url = self.signed_url().data['url']
+        self.assertEqual(url, f'http://testserver/media/{self.lesson.media_file.name}?X-Amz-Expires=300')
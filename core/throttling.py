@@ -0,0 +1,91 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    # '10/min' -> (10, 60)
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    # Fenêtre glissante approchée (compteurs des fenêtres courante et précédente, pondérés) :
+    # une lecture et un INCR par requête. Taux dans settings.AUTH_THROTTLE_RATES[scope]
+    scope = None
+    timer = time.time
+
+    def get_ident_key(self, request, view):
+        # None : requête non limitée ; les sous-classes renvoient l'IP, un compte...
+        return None
+
+    def get_rate(self):
+        rate = settings.AUTH_THROTTLE_RATES.get(self.scope)
+        return parse_rate(rate) if rate else None
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = self.get_rate()
+        ident = self.get_ident_key(request, view)
+        if rate is None or ident is None:
+            return True
+        limit, duration = rate
+        now = self.timer()
+        window, position = divmod(now, duration)
+        current = f'throttle:{self.scope}:{ident}:{int(window)}'
+        previous = f'throttle:{self.scope}:{ident}:{int(window) - 1}'
+        counts = cache.get_many([current, previous])
+        done, before = counts.get(current, 0), counts.get(previous, 0)
+        weight = 1 - position / duration
+
+        if before * weight + done >= limit:
+            # Attente jusqu'à ce que la part de la fenêtre précédente repasse sous la limite
+            if done >= limit or not before:
+                self.wait_seconds = duration - position
+            else:
+                self.wait_seconds = (weight - (limit - done - 1) / before) * duration
+            return False
+
+        if not cache.add(current, 1, duration * 2):
+            try:
+                cache.incr(current)
+            except ValueError:
+                # Clé expirée entre add() et incr()
+                cache.set(current, 1, duration * 2)
+        return True
+
+    def wait(self):
+        return math.ceil(self.wait_seconds) if self.wait_seconds else None
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    # Tentatives de connexion par adresse IP
+    scope = 'login_ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginUsernameThrottle(SlidingWindowThrottle):
+    # Tentatives sur un même compte, quelle que soit l'IP (credential stuffing distribué)
+    scope = 'login_username'
+
+    def get_ident_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username.strip():
+            return None
+        return hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+
+
+class RegistrationIPThrottle(SlidingWindowThrottle):
+    # Inscriptions par adresse IP
+    scope = 'register_ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
@@ -0,0 +1,64 @@
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Concat, Substr
+
+
+def move_subtree(category, new_path):
+    # Réécrit le chemin du nœud et de tous ses descendants en une seule requête
+    queryset = type(category).objects
+    if not category.path:
+        queryset.filter(pk=category.pk).update(path=new_path, depth=new_path.count('/') - 1)
+        return
+    queryset.filter(path__startswith=category.path).update(
+        path=Concat(Value(new_path), Substr('path', len(category.path) + 1)),
+        depth=F('depth') + new_path.count('/') - category.path.count('/'),
+    )
+
+
+def rebuild_paths(model=None):
+    # Recalcule tous les chemins (données migrées ou insérées via bulk_create)
+    from .models import Category
+
+    model = model or Category
+    nodes = list(model.objects.only('id', 'parent_id', 'path', 'depth'))
+    children = {}
+    for node in nodes:
+        children.setdefault(node.parent_id, []).append(node)
+    stack = [(node, '') for node in children.get(None, [])]
+    while stack:
+        node, parent_path = stack.pop()
+        node.path = f"{parent_path}{node.pk:010d}/"
+        node.depth = node.path.count('/') - 1
+        stack.extend((child, node.path) for child in children.get(node.pk, []))
+    model.objects.bulk_update(nodes, ['path', 'depth'], batch_size=1000)
+
+
+def build_tree():
+    # Une seule requête : catégories actives + nombre de cours publiés rattachés directement
+    from .models import Category
+
+    categories = list(
+        Category.objects.filter(is_active=True)
+        .annotate(published_courses=Count('course', filter=Q(course__is_published=True)))
+        .order_by('display_order', 'name')
+    )
+    nodes = {
+        category.pk: {
+            'id': category.pk, 'name': category.name, 'slug': category.slug, 'icon': category.icon,
+            'depth': category.depth, 'published_courses': category.published_courses,
+            'total_published_courses': 0, 'children': [],
+        }
+        for category in categories
+    }
+    roots = []
+    for category in categories:
+        # Le chemin donne tous les ancêtres : on cumule les compteurs de sous-arbre
+        ancestors = [int(pk) for pk in category.path.split('/') if pk] or [category.pk]
+        if not all(pk in nodes for pk in ancestors):
+            continue  # sous-arbre d'une catégorie désactivée
+        for ancestor_id in ancestors:
+            nodes[ancestor_id]['total_published_courses'] += category.published_courses
+        if category.parent_id is None:
+            roots.append(nodes[category.pk])
+        else:
+            nodes[category.parent_id]['children'].append(nodes[category.pk])
+    return roots
@@ -1,16 +1,92 @@
-from django.shortcuts import render
-from rest_framework import viewsets, permissions
-from .models import User, Category, Course, Lesson
-from .serializers import UserSerializer, CategorySerializer, CourseSerializer, LessonSerializer
+import hashlib
+from datetime import timedelta
+from functools import lru_cache
 
+from django.conf import settings
+from django.db.models import Max, Prefetch, Sum
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .cache import CatalogCacheMixin
+from .db_routers import ReplicaReadMixin
+from .imports import import_courses, parse_upload
+from .media import can_access_lesson, media_url
+from .models import User, Category, Course, CourseDailyStats, Lesson, LessonProgress, Payment
+from .pagination import (
+    CourseCursorPagination, LessonCursorPagination, ProgressCursorPagination, UserCursorPagination,
+)
+from .payments import apply_payment_status, start_payment, verify_signature
+from .progress import record_progress
+from .recommendations import recommended_courses, related_courses
+from .search import search_courses
+from .stats import PROGRESS_BUCKETS
+from .sync import InvalidToken, changes_since, read_token
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, RegistrationIPThrottle
+from .tree import build_tree
+from .serializers import (
+    UserSerializer, CategorySerializer, CourseSerializer, CourseListSerializer, LessonSerializer,
+    LessonProgressSerializer, ProgressBatchSerializer, PaymentSerializer, PaymentWebhookSerializer,
+    DailyStatsSerializer, CourseStatsSummarySerializer, CourseImportBatchSerializer,
+    CourseSyncSerializer, EnrollmentSyncSerializer,
+)
 
+
+@lru_cache(maxsize=1)
+def _rendered_shell():
+    html = render_to_string('index.html')
+    return html, f'"{hashlib.md5(html.encode()).hexdigest()}"'
+
+
+def frontend_shell():
+    # Le gabarit ne dépend que des URLs fingerprintées des fichiers statiques :
+    # rendu une fois par processus (à chaque requête en DEBUG, pour voir les modifications)
+    if settings.DEBUG:
+        _rendered_shell.cache_clear()
+    return _rendered_shell()
+
+
+@gzip_page
+@cache_control(no_cache=True)
+@condition(etag_func=lambda request: frontend_shell()[1])
 def home(request):
-    return render(request, 'index.html')
+    # Revalidation systématique (no-cache) : une visite répétée coûte un 304 sans corps
+    return HttpResponse(frontend_shell()[0])
+
+
+class IsInstructor(permissions.BasePermission):
+    message = "Réservé aux instructeurs."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.user_type == 'instructor' or user.is_staff))
 
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['user_type', 'is_active']
+
+    def get_queryset(self):
+        # Les administrateurs (is_staff) voient tous les comptes, les autres uniquement le leur
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(pk=self.request.user.pk)
 
     def get_permissions(self):
         # Inscription (POST) ouverte à tous — lecture/modif nécessite auth
@@ -18,23 +94,266 @@ class UserViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
+    def get_throttles(self):
+        # Limite les inscriptions en rafale, avant validation et hachage du mot de passe
+        if self.action == 'create':
+            return [RegistrationIPThrottle()]
+        return super().get_throttles()
+
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        # GET /api/users/me/ — utilisateur déjà résolu par l'authentification, sans requête SQL
+        return Response(self.get_serializer(request.user).data)
+
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    # Rejet (429 + Retry-After) avant toute lecture en base ou vérification du mot de passe
+    throttle_classes = (LoginIPThrottle, LoginUsernameThrottle)
+
+
+class CategoryViewSet(ReplicaReadMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
+    cached_actions = ('list', 'retrieve', 'tree')
+    cache_authenticated = True
+
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        # GET /api/categories/tree/ — hiérarchie complète avec nombre de cours publiés par sous-arbre
+        return self.handle_cached(lambda request: Response(build_tree()), request)
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ReplicaReadMixin, CatalogCacheMixin, viewsets.ModelViewSet):
     queryset = Course.objects.filter(is_published=True)
     serializer_class = CourseSerializer
+    pagination_class = CourseCursorPagination
+    cached_actions = ('list', 'retrieve', 'search', 'related')
+    search_limit = 50
+    recommendation_limit = 10
+    list_actions = ('list', 'search', 'related', 'recommended')
+
+    def get_queryset(self):
+        # Instructeur, catégorie et leçons chargés en un nombre fixe de requêtes
+        # (sinon 3 requêtes supplémentaires par cours sérialisé)
+        queryset = super().get_queryset().select_related('instructor', 'category')
+        if self.action in self.list_actions:
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch('lessons', queryset=Lesson.objects.order_by('display_order', 'id'))
+        )
+
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return CourseListSerializer
+        return super().get_serializer_class()
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search', 'related']:
             return [permissions.AllowAny()]
+        if self.action == 'bulk_import':
+            return [IsInstructor()]
         return [permissions.IsAuthenticated()]
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        # POST /api/courses/import/ — un cours et ses leçons, {"courses": [...]} ou un fichier JSON/CSV,
+        # validés en entier puis écrits en une transaction
+        if 'file' in request.FILES:
+            try:
+                courses = parse_upload(request.FILES['file'])
+            except ValueError:
+                raise ValidationError({'file': ["Fichier JSON ou CSV illisible."]})
+        elif isinstance(request.data, list):
+            courses = request.data
+        else:
+            courses = request.data.get('courses', [request.data])
+        serializer = CourseImportBatchSerializer(data={'courses': courses}, context={'user': request.user})
+        serializer.is_valid(raise_exception=True)
+        created = import_courses(serializer.validated_data['courses'], request.user)
+        return Response({
+            'created': len(created),
+            'courses': [
+                {'id': course.pk, 'slug': course.slug, 'title': course.title, 'lessons_count': course.lessons_count}
+                for course in created
+            ],
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        # GET /api/courses/<id>/related/ — voisins précalculés (co-inscriptions), sinon cours populaires
+        return self.handle_cached(self._related, request)
+
+    def _related(self, request):
+        courses = related_courses(self.get_queryset(), self.get_object(), self.recommendation_limit)
+        return Response(self.get_serializer(courses, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def recommended(self, request):
+        # GET /api/courses/recommended/ — pour l'utilisateur connecté, à partir de ses inscriptions
+        courses = recommended_courses(self.get_queryset(), request.user, self.recommendation_limit)
+        return Response(self.get_serializer(courses, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        # GET /api/courses/search/?q=... — résultats classés par pertinence
+        return self.handle_cached(self._search, request)
+
+    def _search(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', self.search_limit)), 100)
+        except ValueError:
+            limit = self.search_limit
+        courses = search_courses(self.get_queryset(), request.query_params.get('q', ''), limit)
+        return Response(self.get_serializer(courses, many=True).data)
+
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LessonCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['course']
+
+    @action(detail=True, methods=['get'])
+    def media(self, request, pk=None):
+        # GET /api/lessons/<id>/media/ — lien signé de courte durée vers le fichier de la leçon
+        lesson = self.get_object()
+        if not lesson.media_file:
+            raise NotFound("Aucun fichier pour cette leçon.")
+        if not can_access_lesson(request.user, lesson):
+            raise PermissionDenied("Inscription au cours requise.")
+        return Response({
+            'url': request.build_absolute_uri(media_url(lesson)),
+            'expires_in': settings.MEDIA_URL_MAX_AGE,
+        })
+
+
+class LessonProgressViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    serializer_class = LessonProgressSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ProgressCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['lesson__course']
+
+    def get_queryset(self):
+        return LessonProgress.objects.filter(user=self.request.user).select_related('lesson')
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        # POST /api/progress/batch/ — plusieurs événements de lecture en une seule requête
+        serializer = ProgressBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(record_progress(request.user, serializer.validated_data['events']))
+
+
+class PaymentViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                     viewsets.GenericViewSet):
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Payment.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def create(self, request, *args, **kwargs):
+        # Réponse immédiate (202) : la confirmation du fournisseur se fait en tâche de fond
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payment = start_payment(request.user, serializer.validated_data['course'])
+        return Response(self.get_serializer(payment).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny],
+            authentication_classes=[])
+    def webhook(self, request):
+        # Signature HMAC du corps brut dans l'en-tête X-Payment-Signature
+        if not verify_signature(request.body, request.headers.get('X-Payment-Signature')):
+            raise PermissionDenied("Signature invalide.")
+        serializer = PaymentWebhookSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payment = apply_payment_status(**serializer.validated_data)
+        except Payment.DoesNotExist:
+            raise NotFound("Transaction inconnue.")
+        return Response({'transaction_id': payment.transaction_id, 'status': payment.status})
+
+
+class InstructorStatsViewSet(viewsets.ViewSet):
+    # Tableau de bord instructeur : lu uniquement dans les agrégats quotidiens (CourseDailyStats)
+    permission_classes = [IsInstructor]
+    default_days = 30
+    max_days = 365
+
+    def get_rollups(self, request):
+        try:
+            days = min(max(int(request.query_params.get('days', self.default_days)), 1), self.max_days)
+        except ValueError:
+            days = self.default_days
+        until = timezone.localdate()
+        since = until - timedelta(days=days - 1)
+        rollups = CourseDailyStats.objects.filter(course__instructor=request.user, day__gte=since, day__lte=until)
+        return rollups, {'from': since, 'to': until, 'progress_buckets': [list(b) for b in PROGRESS_BUCKETS]}
+
+    def series(self, rollups):
+        return DailyStatsSerializer(
+            rollups.order_by('day', 'currency').values('day', 'currency').annotate(
+                enrollments=Sum('enrollments'), payments=Sum('payments'), revenue=Sum('revenue'),
+            ),
+            many=True,
+        ).data
+
+    def latest_distribution(self, rollups):
+        latest = rollups.exclude(progress_distribution=[]).aggregate(day=Max('day'))['day']
+        return dict(rollups.filter(day=latest).values_list('course_id', 'progress_distribution'))
+
+    def list(self, request):
+        # GET /api/instructor/stats/?days=30 — séries quotidiennes et totaux par cours
+        rollups, meta = self.get_rollups(request)
+        distribution = self.latest_distribution(rollups)
+        courses = rollups.order_by('course_id').values('course_id', 'course__title', 'currency').annotate(
+            enrollments=Sum('enrollments'), payments=Sum('payments'), revenue=Sum('revenue'),
+        )
+        for course in courses:
+            course['progress_distribution'] = distribution.get(course['course_id'], [])
+        return Response({
+            **meta,
+            'series': self.series(rollups),
+            'courses': CourseStatsSummarySerializer(courses, many=True).data,
+        })
+
+    def retrieve(self, request, pk=None):
+        course = get_object_or_404(Course.objects.only('id', 'title'), pk=pk, instructor=request.user)
+        rollups, meta = self.get_rollups(request)
+        rollups = rollups.filter(course=course)
+        return Response({
+            **meta,
+            'course': {'id': course.pk, 'title': course.title},
+            'series': self.series(rollups),
+            'progress_distribution': self.latest_distribution(rollups).get(course.pk, []),
+        })
+
+
+@method_decorator(gzip_page, name='dispatch')
+class SyncView(APIView):
+    # GET /api/sync/?since=<jeton> — uniquement ce qui a changé (ou disparu) pour les cours suivis ;
+    # sans jeton : instantané complet. Réponse compressée (gzip) si le client l'accepte.
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        since = None
+        token = request.query_params.get('since')
+        if token:
+            try:
+                since = read_token(request.user, token)
+            except InvalidToken as exc:
+                raise ValidationError({'since': [str(exc)]})
+        changes = changes_since(request.user, since)
+        context = {'request': request}
+        return Response({
+            'token': changes['token'],
+            'full': since is None,
+            'categories': CategorySerializer(changes['categories'], many=True, context=context).data,
+            'courses': CourseSyncSerializer(changes['courses'], many=True, context=context).data,
+            'lessons': LessonSerializer(changes['lessons'], many=True, context=context).data,
+            'enrollments': EnrollmentSyncSerializer(changes['enrollments'], many=True, context=context).data,
+            'deleted': changes['deleted'],
+        })
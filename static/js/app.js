@@ -0,0 +1,592 @@
+// Data
+const categories = [
+    { id: 1, name: 'Développement Web', icon: 'fa-code', count: 45, description: 'HTML, CSS, JavaScript, Vue.js' },
+    { id: 2, name: 'Marketing Digital', icon: 'fa-bullhorn', count: 32, description: 'SEO, Réseaux sociaux, Publicité' },
+    { id: 3, name: 'Design Graphique', icon: 'fa-palette', count: 28, description: 'Photoshop, Illustrator, Canva' },
+    { id: 4, name: 'Bureautique', icon: 'fa-file-alt', count: 38, description: 'Word, Excel, PowerPoint' },
+    { id: 5, name: 'Entrepreneuriat', icon: 'fa-lightbulb', count: 25, description: 'Business, Gestion, Finance' },
+    { id: 6, name: 'Langues', icon: 'fa-language', count: 20, description: 'Anglais, Français, Arabe' }
+];
+
+const courses = [
+    {
+        id: 1,
+        title: 'Développement Web Complet avec Vue.js',
+        category: 'Développement Web',
+        description: 'Apprenez à créer des applications web modernes et réactives avec Vue.js, de zéro à expert.',
+        price: 35000,
+        rating: 4.8,
+        students: 234,
+        duration: '12 heures',
+        lessons: 45,
+        level: 'Intermédiaire',
+        instructor: 'Dr. Abdoul Karim',
+        icon: 'fa-code'
+    },
+    {
+        id: 2,
+        title: 'Marketing Digital: Stratégies Gagnantes',
+        category: 'Marketing Digital',
+        description: 'Maîtrisez les techniques du marketing digital pour développer votre présence en ligne.',
+        price: 28000,
+        rating: 4.9,
+        students: 189,
+        duration: '8 heures',
+        lessons: 32,
+        level: 'Débutant',
+        instructor: 'Marie Ndouba',
+        icon: 'fa-bullhorn'
+    },
+    {
+        id: 3,
+        title: 'Design Graphique avec Adobe Suite',
+        category: 'Design Graphique',
+        description: 'Créez des designs professionnels avec Photoshop, Illustrator et InDesign.',
+        price: 42000,
+        rating: 4.7,
+        students: 156,
+        duration: '15 heures',
+        lessons: 52,
+        level: 'Tous niveaux',
+        instructor: 'Jean-Paul Tabo',
+        icon: 'fa-palette'
+    },
+    {
+        id: 4,
+        title: 'Excel: De Débutant à Expert',
+        category: 'Bureautique',
+        description: 'Maîtrisez Excel pour analyser vos données et créer des tableaux de bord professionnels.',
+        price: 22000,
+        rating: 4.9,
+        students: 412,
+        duration: '10 heures',
+        lessons: 38,
+        level: 'Tous niveaux',
+        instructor: 'Fatima Hassan',
+        icon: 'fa-file-excel'
+    },
+    {
+        id: 5,
+        title: 'Créer et Gérer son Entreprise',
+        category: 'Entrepreneuriat',
+        description: 'Apprenez les fondamentaux de l\'entrepreneuriat et lancez votre business avec succès.',
+        price: 32000,
+        rating: 4.8,
+        students: 198,
+        duration: '14 heures',
+        lessons: 42,
+        level: 'Débutant',
+        instructor: 'Moussa Idriss',
+        icon: 'fa-briefcase'
+    },
+    {
+        id: 6,
+        title: 'Anglais Professionnel',
+        category: 'Langues',
+        description: 'Développez vos compétences en anglais professionnel pour le monde des affaires.',
+        price: 25000,
+        rating: 4.6,
+        students: 267,
+        duration: '20 heures',
+        lessons: 60,
+        level: 'Intermédiaire',
+        instructor: 'Sarah Williams',
+        icon: 'fa-language'
+    }
+];
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    renderCategories();
+    renderCourses();
+    renderAllCourses();
+});
+
+// Render Functions
+function renderCategories() {
+    const container = document.getElementById('categoriesContainer');
+    container.innerHTML = categories.map(cat => `
+        <div class="category-card" onclick="filterCoursesByCategory('${cat.name}')">
+            <div class="category-icon">
+                <i class="fas ${cat.icon}"></i>
+            </div>
+            <h3>${cat.name}</h3>
+            <p>${cat.count} cours disponibles</p>
+            <p style="font-size: 0.85rem; color: var(--gray); margin-top: 0.5rem;">${cat.description}</p>
+        </div>
+    `).join('');
+}
+
+function renderCourses(coursesToRender = courses.slice(0, 3)) {
+    const container = document.getElementById('coursesContainer');
+    container.innerHTML = coursesToRender.map(course => createCourseCard(course)).join('');
+}
+
+function renderAllCourses() {
+    const container = document.getElementById('allCoursesContainer');
+    container.innerHTML = courses.map(course => createCourseCard(course)).join('');
+}
+
+function createCourseCard(course) {
+    return `
+        <div class="course-card" onclick="showCourseDetail(${course.id})">
+            <div class="course-thumbnail">
+                <i class="fas ${course.icon}"></i>
+            </div>
+            <div class="course-content">
+                <span class="course-category">${course.category}</span>
+                <h3 class="course-title">${course.title}</h3>
+                <p class="course-description">${course.description}</p>
+                <div class="course-stats">
+                    <span><i class="fas fa-user"></i> ${course.students} étudiants</span>
+                    <span><i class="fas fa-clock"></i> ${course.duration}</span>
+                </div>
+                <div class="course-meta">
+                    <div class="course-price">${course.price.toLocaleString()} FCFA</div>
+                    <div class="course-rating">
+                        <i class="fas fa-star"></i>
+                        <span>${course.rating}</span>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+// Navigation Functions
+function showPage(pageName) {
+    document.querySelectorAll('.page').forEach(page => page.style.display = 'none');
+
+    if (pageName === 'home') {
+        document.getElementById('homePage').style.display = 'block';
+        document.getElementById('heroSection').style.display = 'block';
+    } else if (pageName === 'courses') {
+        document.getElementById('coursesPage').style.display = 'block';
+        document.getElementById('heroSection').style.display = 'none';
+    } else if (pageName === 'dashboard') {
+        document.getElementById('dashboardPage').style.display = 'block';
+        document.getElementById('heroSection').style.display = 'none';
+        showDashboardSection('overview');
+    } else if (pageName === 'instructors') {
+        document.getElementById('instructorPage').style.display = 'block';
+        document.getElementById('heroSection').style.display = 'none';
+    } else if (pageName === 'community') {
+        document.getElementById('communityPage').style.display = 'block';
+        document.getElementById('heroSection').style.display = 'none';
+    }
+}
+
+function showDashboardSection(section) {
+    const content = document.getElementById('dashboardContent');
+    document.querySelectorAll('.sidebar-item').forEach(item => item.classList.remove('active'));
+    event.target.closest('.sidebar-item').classList.add('active');
+
+    if (section === 'overview') {
+        content.innerHTML = `
+            <h2 style="margin-bottom: 2rem;">Tableau de Bord</h2>
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <div class="stat-value">5</div>
+                    <div class="stat-label">Cours en cours</div>
+                </div>
+                <div class="stat-card" style="background: linear-gradient(135deg, var(--success), #1e7e34);">
+                    <div class="stat-value">3</div>
+                    <div class="stat-label">Cours terminés</div>
+                </div>
+                <div class="stat-card" style="background: linear-gradient(135deg, var(--secondary), #e0a800);">
+                    <div class="stat-value">42h</div>
+                    <div class="stat-label">Temps d'apprentissage</div>
+                </div>
+            </div>
+        `;
+    } else if (section === 'myCourses') {
+        content.innerHTML = `
+            <h2 style="margin-bottom: 2rem;">Mes Cours</h2>
+            <div class="courses-grid">
+                ${courses.slice(0, 3).map(course => `
+                    <div class="course-card">
+                        <div class="course-thumbnail">
+                            <i class="fas ${course.icon}"></i>
+                        </div>
+                        <div class="course-content">
+                            <h3 class="course-title">${course.title}</h3>
+                            <p style="color: var(--gray); margin: 0.5rem 0;">Progression</p>
+                            <div class="progress-bar">
+                                <div class="progress-fill" style="width: ${Math.random() * 100}%"></div>
+                            </div>
+                            <button class="btn btn-primary" style="width: 100%; margin-top: 1rem;" onclick="showCourseDetail(${course.id})">
+                                Continuer
+                            </button>
+                        </div>
+                    </div>
+                `).join('')}
+            </div>
+        `;
+    } else if (section === 'certificates') {
+        content.innerHTML = `
+            <h2 style="margin-bottom: 2rem;">Mes Certificats</h2>
+            <div class="certificate">
+                <div class="certificate-title">
+                    <i class="fas fa-certificate" style="color: var(--secondary);"></i>
+                    Certificat de Réussite
+                </div>
+                <div class="certificate-body">
+                    Ceci certifie que<br>
+                    <strong style="font-size: 1.5rem; color: var(--primary);">Votre Nom</strong><br>
+                    a complété avec succès le cours<br>
+                    <strong style="font-size: 1.3rem;">"Excel: De Débutant à Expert"</strong><br>
+                    Délivré le ${new Date().toLocaleDateString('fr-FR')}
+                </div>
+                <div class="certificate-signature">
+                    <div>
+                        <p>____________________</p>
+                        <p>Formateur</p>
+                    </div>
+                    <div>
+                        <p>____________________</p>
+                        <p>TchadSkills</p>
+                    </div>
+                </div>
+            </div>
+            <button class="btn btn-primary" style="margin-top: 2rem;">
+                <i class="fas fa-download"></i> Télécharger le certificat
+            </button>
+        `;
+    } else if (section === 'settings') {
+        content.innerHTML = `
+            <h2 style="margin-bottom: 2rem;">Paramètres du Compte</h2>
+            <form>
+                <div class="form-group">
+                    <label class="form-label">Nom complet</label>
+                    <input type="text" class="form-input" value="Votre Nom">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Email</label>
+                    <input type="email" class="form-input" value="votre@email.com">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Téléphone</label>
+                    <input type="tel" class="form-input" value="+235 XX XX XX XX">
+                </div>
+                <button type="submit" class="btn btn-primary">Sauvegarder les modifications</button>
+            </form>
+        `;
+    }
+}
+
+function showCourseDetail(courseId) {
+    const course = courses.find(c => c.id === courseId);
+    if (!course) return;
+
+    document.getElementById('courseModalTitle').textContent = course.title;
+    document.getElementById('courseModalBody').innerHTML = `
+        <div class="video-container">
+            <div class="video-placeholder" onclick="playVideo()">
+                <i class="fas fa-play-circle"></i>
+            </div>
+        </div>
+
+        <div style="margin: 2rem 0;">
+            <h3>À propos de ce cours</h3>
+            <p style="color: var(--gray); margin: 1rem 0;">${course.description}</p>
+
+            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; margin: 2rem 0;">
+                <div>
+                    <i class="fas fa-user" style="color: var(--primary);"></i>
+                    <strong>Formateur:</strong> ${course.instructor}
+                </div>
+                <div>
+                    <i class="fas fa-signal" style="color: var(--primary);"></i>
+                    <strong>Niveau:</strong> ${course.level}
+                </div>
+                <div>
+                    <i class="fas fa-clock" style="color: var(--primary);"></i>
+                    <strong>Durée:</strong> ${course.duration}
+                </div>
+                <div>
+                    <i class="fas fa-book" style="color: var(--primary);"></i>
+                    <strong>Leçons:</strong> ${course.lessons}
+                </div>
+            </div>
+        </div>
+
+        <div class="course-sections">
+            <div class="section-item">
+                <div class="section-header" onclick="toggleSection(this)">
+                    <span><i class="fas fa-folder"></i> Module 1: Introduction</span>
+                    <i class="fas fa-chevron-down"></i>
+                </div>
+                <div class="lesson-list">
+                    <div class="lesson-item">
+                        <span><i class="fas fa-play-circle"></i> Leçon 1: Présentation</span>
+                        <span>10:32</span>
+                    </div>
+                    <div class="lesson-item">
+                        <span><i class="fas fa-play-circle"></i> Leçon 2: Installation</span>
+                        <span>15:45</span>
+                    </div>
+                </div>
+            </div>
+            <div class="section-item">
+                <div class="section-header" onclick="toggleSection(this)">
+                    <span><i class="fas fa-folder"></i> Module 2: Fondamentaux</span>
+                    <i class="fas fa-chevron-down"></i>
+                </div>
+                <div class="lesson-list">
+                    <div class="lesson-item">
+                        <span><i class="fas fa-play-circle"></i> Leçon 3: Les bases</span>
+                        <span>22:18</span>
+                    </div>
+                </div>
+            </div>
+        </div>
+
+        <div style="margin-top: 2rem; padding-top: 2rem; border-top: 2px solid var(--border);">
+            <div style="display: flex; justify-content: space-between; align-items: center;">
+                <div>
+                    <div class="course-price" style="font-size: 2rem;">${course.price.toLocaleString()} FCFA</div>
+                    <p style="color: var(--gray); margin-top: 0.5rem;">Accès à vie • Certificat inclus</p>
+                </div>
+                <button class="btn btn-primary" style="padding: 1rem 3rem; font-size: 1.1rem;" onclick="enrollCourse(${course.id})">
+                    <i class="fas fa-shopping-cart"></i> S'inscrire maintenant
+                </button>
+            </div>
+        </div>
+    `;
+
+    showModal('courseModal');
+}
+
+function enrollCourse(courseId) {
+    closeModal('courseModal');
+    showModal('paymentModal');
+}
+
+function toggleSection(element) {
+    const lessonList = element.nextElementSibling;
+    const icon = element.querySelector('.fa-chevron-down');
+    lessonList.classList.toggle('active');
+    icon.style.transform = lessonList.classList.contains('active') ? 'rotate(180deg)' : 'rotate(0)';
+}
+
+function selectPayment(method) {
+    document.querySelectorAll('.payment-method').forEach(m => m.classList.remove('selected'));
+    event.target.closest('.payment-method').classList.add('selected');
+    document.getElementById('paymentForm').style.display = 'block';
+}
+
+function processPayment() {
+    showNotification('Paiement en cours de traitement...', 'success');
+    setTimeout(() => {
+        closeModal('paymentModal');
+        showNotification('Paiement réussi! Bienvenue dans le cours.', 'success');
+        showPage('dashboard');
+    }, 2000);
+}
+
+// Modal Functions
+function showModal(modalId) {
+    document.getElementById(modalId).classList.add('active');
+}
+
+function closeModal(modalId) {
+    document.getElementById(modalId).classList.remove('active');
+}
+
+// ============================================================
+// AUTHENTIFICATION RÉELLE — connectée à l'API Django/JWT
+// ============================================================
+
+// Stockage du token et de l'utilisateur courant
+let authToken = localStorage.getItem('tchadskills_token') || null;
+let currentUser = JSON.parse(localStorage.getItem('tchadskills_user') || 'null');
+
+// Met à jour la navbar selon l'état de connexion
+function updateNavbar() {
+    const loginBtn = document.querySelector('[onclick="showModal('loginModal')"]');
+    if (loginBtn && currentUser) {
+        loginBtn.textContent = currentUser.username;
+        loginBtn.onclick = () => handleLogout();
+    }
+}
+updateNavbar();
+
+// Connexion via POST /api/token/
+async function handleLogin(e) {
+    e.preventDefault();
+    const username = document.getElementById('loginUsername').value.trim();
+    const password = document.getElementById('loginPassword').value;
+    const btn = document.getElementById('loginBtn');
+    const errorDiv = document.getElementById('loginError');
+
+    errorDiv.style.display = 'none';
+    btn.disabled = true;
+    btn.textContent = 'Connexion en cours...';
+
+    try {
+        const response = await fetch('/api/token/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username, password })
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            // Stocker le token JWT
+            authToken = data.access;
+            localStorage.setItem('tchadskills_token', data.access);
+            localStorage.setItem('tchadskills_refresh', data.refresh);
+
+            // Récupérer les infos de l'utilisateur connecté
+            const userResp = await fetch('/api/users/me/', {
+                headers: { 'Authorization': 'Bearer ' + data.access }
+            });
+            if (userResp.ok) {
+                const user = await userResp.json();
+                currentUser = user;
+                localStorage.setItem('tchadskills_user', JSON.stringify(user));
+            }
+
+            showNotification('Connexion réussie ! Bienvenue ' + username, 'success');
+            closeModal('loginModal');
+            updateNavbar();
+            showPage('dashboard');
+        } else {
+            // Afficher le message d'erreur exact du serveur
+            const msg = data.detail || data.non_field_errors?.[0] || 'Identifiants incorrects.';
+            errorDiv.textContent = '❌ ' + msg;
+            errorDiv.style.display = 'block';
+        }
+    } catch (err) {
+        errorDiv.textContent = '❌ Impossible de contacter le serveur. Vérifiez votre connexion.';
+        errorDiv.style.display = 'block';
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Se connecter';
+    }
+}
+
+// Déconnexion
+function handleLogout() {
+    authToken = null;
+    currentUser = null;
+    localStorage.removeItem('tchadskills_token');
+    localStorage.removeItem('tchadskills_refresh');
+    localStorage.removeItem('tchadskills_user');
+    showNotification('Déconnexion réussie.', 'success');
+    showPage('home');
+    updateNavbar();
+}
+
+// Inscription via POST /api/users/
+async function handleRegister(e) {
+    e.preventDefault();
+    const username = document.getElementById('registerUsername').value.trim();
+    const fullName = document.getElementById('registerFullName').value.trim();
+    const email = document.getElementById('registerEmail').value.trim();
+    const phone = document.getElementById('registerPhone').value.trim();
+    const password = document.getElementById('registerPassword').value;
+    const user_type = document.getElementById('registerType').value;
+    const btn = document.getElementById('registerBtn');
+    const errorDiv = document.getElementById('registerError');
+
+    const nameParts = fullName.split(' ');
+    const first_name = nameParts[0] || '';
+    const last_name = nameParts.slice(1).join(' ') || '';
+
+    errorDiv.style.display = 'none';
+    btn.disabled = true;
+    btn.textContent = 'Inscription en cours...';
+
+    try {
+        const response = await fetch('/api/users/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username, email, first_name, last_name, phone, user_type, password })
+        });
+
+        const data = await response.json();
+
+        if (response.ok || response.status === 201) {
+            showNotification('Inscription réussie ! Connectez-vous.', 'success');
+            closeModal('registerModal');
+            // Pré-remplir le champ username dans le formulaire de login
+            setTimeout(() => {
+                showModal('loginModal');
+                document.getElementById('loginUsername').value = username;
+            }, 500);
+        } else {
+            const msgs = Object.entries(data).map(([k, v]) => `${k}: ${Array.isArray(v) ? v[0] : v}`).join(' | ');
+            errorDiv.textContent = '❌ ' + msgs;
+            errorDiv.style.display = 'block';
+        }
+    } catch (err) {
+        errorDiv.textContent = '❌ Impossible de contacter le serveur.';
+        errorDiv.style.display = 'block';
+    } finally {
+        btn.disabled = false;
+        btn.textContent = "S'inscrire";
+    }
+}
+
+function handleCreateCourse(e) {
+    e.preventDefault();
+    showNotification('Cours créé avec succès!', 'success');
+    closeModal('createCourseModal');
+}
+
+// Utility Functions
+function showNotification(message, type = 'success') {
+    const notification = document.getElementById('notification');
+    notification.textContent = message;
+    notification.className = `notification ${type} show`;
+
+    setTimeout(() => {
+        notification.classList.remove('show');
+    }, 3000);
+}
+
+function toggleMobileMenu() {
+    document.getElementById('navMenu').classList.toggle('active');
+}
+
+function searchCourses() {
+    const query = document.getElementById('searchInput').value.toLowerCase();
+    const filtered = courses.filter(c => 
+        c.title.toLowerCase().includes(query) || 
+        c.description.toLowerCase().includes(query) ||
+        c.category.toLowerCase().includes(query)
+    );
+    renderCourses(filtered);
+    showPage('courses');
+}
+
+function filterCoursesByCategory(category) {
+    const filtered = courses.filter(c => c.category === category);
+    renderCourses(filtered);
+    showPage('courses');
+}
+
+function setLanguage(lang) {
+    document.querySelectorAll('.lang-btn').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+
+    if (lang === 'ar') {
+        document.documentElement.setAttribute('dir', 'rtl');
+        showNotification('Language switched to Arabic (Demo)', 'success');
+    } else {
+        document.documentElement.setAttribute('dir', 'ltr');
+    }
+}
+
+function playVideo() {
+    showNotification('Lecteur vidéo en cours de chargement...', 'success');
+}
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    if (event.target.classList.contains('modal')) {
+        event.target.classList.remove('active');
+    }
+}
@@ -1,7 +1,10 @@
 import os
+import sys
 from pathlib import Path
 from decouple import config
 import dj_database_url
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -9,6 +12,10 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-tchadskills-professio
 DEBUG = config('DEBUG', default=True, cast=bool)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*').split(',')
 
+# Simulations locales (paiement, tâches eager) : développement et tests uniquement
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+LOCAL_FALLBACKS = DEBUG or TESTING
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -29,6 +36,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -36,6 +44,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,13 +70,88 @@ TEMPLATES = [
 WSGI_APPLICATION = 'tchadskills_project.wsgi.application'
 
 # Configuration de la base de données (SQLite par défaut, PostgreSQL si DATABASE_URL est présent)
-DATABASES = {
-    'default': dj_database_url.config(
-        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600
+# Mutualisation des connexions (DB_POOL_MODE) — Django 4.2 n'a pas de pool psycopg intégré :
+# - persistent : une connexion persistante par worker, vérifiée avant réutilisation
+# - pgbouncer : derrière PgBouncer en mode transaction ; pas de curseurs côté serveur
+#   (les exports en flux sont alors lus en entier par le client : les lancer sur le primaire direct)
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+
+
+def database_config(env, default=None):
+    return dj_database_url.config(
+        env=env,
+        default=default,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+        disable_server_side_cursors=DB_POOL_MODE == 'pgbouncer',
     )
+
+
+DATABASES = {
+    'default': database_config('DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+}
+
+# Réplica en lecture optionnel : lectures du catalogue (core.db_routers.ReplicaRouter)
+if config('DATABASE_REPLICA_URL', default=''):
+    DATABASES['replica'] = database_config('DATABASE_REPLICA_URL')
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+# Durée (secondes) pendant laquelle un utilisateur qui vient d'écrire lit sur le primaire
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# Cache : Redis si REDIS_URL est présent, mémoire locale sinon
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tchadskills',
+        }
+    }
+
+# Celery : sans broker configuré, les tâches s'exécutent localement (mode eager),
+# ce qui n'est admis qu'en développement et en tests
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL or 'memory://')
+CELERY_TASK_ALWAYS_EAGER = config(
+    'CELERY_TASK_ALWAYS_EAGER', default=LOCAL_FALLBACKS and CELERY_BROKER_URL.startswith('memory://'), cast=bool
+)
+if not LOCAL_FALLBACKS and CELERY_BROKER_URL.startswith('memory://') and not CELERY_TASK_ALWAYS_EAGER:
+    raise ImproperlyConfigured("CELERY_BROKER_URL (ou REDIS_URL) est requis en production.")
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_BEAT_SCHEDULE = {
+    # Agrégats quotidiens des tableaux de bord instructeur (jours complets uniquement)
+    'rollup-course-stats': {
+        'task': 'core.tasks.rollup_course_stats',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'prune-sync-tombstones': {
+        'task': 'core.tasks.prune_sync_tombstones',
+        'schedule': crontab(hour=1, minute=0),
+    },
+    'rebuild-recommendations': {
+        'task': 'core.tasks.rebuild_recommendations',
+        'schedule': crontab(hour=2, minute=0),
+    },
 }
 
+# Paiements : fournisseur (Mobile Money, Stripe...) et secret des webhooks.
+# Le fournisseur simulé confirme tout paiement : jamais de valeur par défaut en production
+PAYMENT_PROVIDER = config(
+    'PAYMENT_PROVIDER', default='core.payments.LocalProvider' if LOCAL_FALLBACKS else ''
+)
+PAYMENT_WEBHOOK_SECRET = config('PAYMENT_WEBHOOK_SECRET', default=SECRET_KEY if LOCAL_FALLBACKS else '')
+if not PAYMENT_PROVIDER or not PAYMENT_WEBHOOK_SECRET:
+    raise ImproperlyConfigured("PAYMENT_PROVIDER et PAYMENT_WEBHOOK_SECRET sont requis en production.")
+
 AUTH_USER_MODEL = 'core.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -86,23 +170,70 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Configuration WhiteNoise pour les fichiers statiques en production
+# Configuration WhiteNoise pour les fichiers statiques en production : noms fingerprintés
+# (servis avec Cache-Control immutable), variantes gzip et brotli précalculées au collectstatic
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Médias des leçons (core.media) : stockage privé, liens signés après vérification de l'inscription.
+# Avec AWS_STORAGE_BUCKET_NAME : bucket S3 privé (django-storages), URLs présignées
+PRIVATE_MEDIA_ROOT = config('PRIVATE_MEDIA_ROOT', default=os.path.join(BASE_DIR, 'private_media'))
+AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default='')
+LESSON_MEDIA_STORAGE = (
+    'storages.backends.s3boto3.S3Boto3Storage' if AWS_STORAGE_BUCKET_NAME else 'core.storage.PrivateMediaStorage'
+)
+# django : FileResponse avec Range (sendfile sous gunicorn) ; accel : X-Accel-Redirect vers nginx ;
+# storage : URL présignée du stockage (stockages à querystring_auth, ex. S3 ; sinon comme django)
+MEDIA_DELIVERY = config('MEDIA_DELIVERY', default='storage' if AWS_STORAGE_BUCKET_NAME else 'django')
+# nginx (mode accel) : location /protected-media/ { internal; alias <PRIVATE_MEDIA_ROOT>/; }
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+MEDIA_URL_MAX_AGE = config('MEDIA_URL_MAX_AGE', default=300, cast=int)
+AWS_QUERYSTRING_EXPIRE = MEDIA_URL_MAX_AGE
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
+    # Proxys de confiance devant gunicorn : l'IP cliente est lue dans X-Forwarded-For
+    # (0 = REMOTE_ADDR, en-tête ignoré pour ne pas pouvoir être falsifié)
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+}
+
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'core.authentication.VersionedTokenObtainPairSerializer',
+}
+
+# Limitation des tentatives (core.throttling) : fenêtre glissante dans le cache (Redis en production)
+AUTH_THROTTLE_RATES = {
+    'login_ip': config('THROTTLE_LOGIN_IP', default='20/min'),
+    'login_username': config('THROTTLE_LOGIN_USERNAME', default='5/min'),
+    'register_ip': config('THROTTLE_REGISTER_IP', default='10/hour'),
 }
 
+# Durée (secondes) de mise en cache de l'utilisateur résolu depuis le JWT
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
+# Instrumentation des requêtes (en-tête Server-Timing, /metrics, alertes dans les logs)
+PERF_SLOW_REQUEST_MS = config('PERF_SLOW_REQUEST_MS', default=500, cast=int)
+PERF_SLOW_QUERY_MS = config('PERF_SLOW_QUERY_MS', default=100, cast=int)
+PERF_N_PLUS_ONE_THRESHOLD = config('PERF_N_PLUS_ONE_THRESHOLD', default=10, cast=int)
+# Jeton Bearer de /metrics ; vide : endpoint accessible en DEBUG seulement
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Synchronisation incrémentale (/api/sync/) : conservation des traces de suppression.
+# Un jeton plus ancien déclenche une resynchronisation complète.
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=90, cast=int)
+
+# Recommandations (core.recommendations) : nombre de voisins conservés par cours
+RECOMMENDATIONS_TOP_K = config('RECOMMENDATIONS_TOP_K', default=20, cast=int)
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Sécurité en production
@@ -3,21 +3,37 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
-from core.views import home, UserViewSet, CategoryViewSet, CourseViewSet, LessonViewSet
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from core.views import (
+    home, UserViewSet, CategoryViewSet, CourseViewSet, LessonViewSet, LessonProgressViewSet,
+    PaymentViewSet, InstructorStatsViewSet, SyncView, ThrottledTokenObtainPairView,
+)
+from core import async_views
+from core.media import lesson_media
+from core.metrics import metrics_view
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
 router.register(r'categories', CategoryViewSet)
 router.register(r'courses', CourseViewSet)
 router.register(r'lessons', LessonViewSet)
+router.register(r'progress', LessonProgressViewSet, basename='progress')
+router.register(r'payments', PaymentViewSet, basename='payment')
+router.register(r'instructor/stats', InstructorStatsViewSet, basename='instructor-stats')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home, name='home'),
+    path('metrics', metrics_view, name='metrics'),
     path('api/', include(router.urls)),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/media/<str:token>/', lesson_media, name='lesson_media'),
+    path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # Lecture du catalogue en async (à servir via ASGI : uvicorn / gunicorn -k uvicorn.workers.UvicornWorker)
+    path('api/async/categories/', async_views.category_list, name='async_category_list'),
+    path('api/async/courses/', async_views.course_list, name='async_course_list'),
+    path('api/async/courses/<int:pk>/', async_views.course_detail, name='async_course_detail'),
 ]
 
 if settings.DEBUG: